@@ -23,6 +23,10 @@ class Query:
     meta_conditions: Optional[dict]
     expected_result: Optional[List[int]]
     expected_scores: Optional[List[float]] = None
+    # Number of results the query asked for, as recorded in a trace
+    top: Optional[int] = None
+    # Time the query was sent at (seconds, any epoch), as recorded in a trace
+    timestamp: Optional[float] = None
 
 
 class BaseReader:
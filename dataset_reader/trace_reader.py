@@ -0,0 +1,87 @@
+import json
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from dataset_reader.base_reader import BaseReader, Query, SparseVector
+
+
+class TraceReader(BaseReader):
+    """
+    Reads a recorded query log, to replay it with its original timing.
+
+    Two formats are supported, chosen by the file extension:
+
+    * `.jsonl` - one query per line:
+      `{"vector": [...], "filter": {...}, "top": 10, "timestamp": 1712.5}`,
+      optionally with `sparse_vector` (`{"indices": [...], "values": [...]}`)
+      and `expected_result` (ids of the true neighbours).
+    * `.npz` - numpy arrays `vectors` (n x dim) and `timestamps` (n),
+      optionally `tops` (n), `neighbours` (n x k, padded with -1) and
+      `filters` (n JSON strings, empty for no filter).
+
+    Filters use the `meta_conditions` format of the datasets. The queries are
+    expected to be sorted by timestamp.
+    """
+
+    def __init__(self, path: Path, normalize=False):
+        self.path = Path(path)
+        self.normalize = normalize
+
+    def _vector(self, vector) -> Optional[List[float]]:
+        if vector is None:
+            return None
+        vector = np.asarray(vector, dtype=np.float32)
+        if self.normalize:
+            vector = vector / np.linalg.norm(vector)
+        return vector.tolist()
+
+    def read_jsonl(self) -> Iterator[Query]:
+        with open(self.path, "r") as json_fp:
+            for json_line in json_fp:
+                if not json_line.strip():
+                    continue
+                line = json.loads(json_line)
+                sparse_vector = line.get("sparse_vector")
+                yield Query(
+                    vector=self._vector(line.get("vector")),
+                    sparse_vector=(
+                        SparseVector(**sparse_vector) if sparse_vector else None
+                    ),
+                    meta_conditions=line.get("filter"),
+                    expected_result=line.get("expected_result"),
+                    top=line.get("top"),
+                    # Checked by the replay, which needs it on every query
+                    timestamp=line.get("timestamp"),
+                )
+
+    def read_npz(self) -> Iterator[Query]:
+        with np.load(self.path, allow_pickle=False) as data:
+            vectors = data["vectors"]
+            timestamps = data["timestamps"]
+            tops = data["tops"] if "tops" in data else None
+            neighbours = data["neighbours"] if "neighbours" in data else None
+            filters = data["filters"] if "filters" in data else None
+
+        for i, vector in enumerate(vectors):
+            expected_result = None
+            if neighbours is not None:
+                expected_result = [int(idx) for idx in neighbours[i] if idx >= 0]
+            yield Query(
+                vector=self._vector(vector),
+                sparse_vector=None,
+                meta_conditions=(
+                    json.loads(filters[i])
+                    if filters is not None and filters[i]
+                    else None
+                ),
+                expected_result=expected_result,
+                top=int(tops[i]) if tops is not None else None,
+                timestamp=float(timestamps[i]),
+            )
+
+    def read_queries(self) -> Iterator[Query]:
+        if self.path.suffix == ".npz":
+            return self.read_npz()
+        return self.read_jsonl()
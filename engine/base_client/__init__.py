@@ -1,7 +1,9 @@
 from engine.base_client.client import BaseClient
 from engine.base_client.configure import BaseConfigurator
+from engine.base_client.readiness import IndexBuildError, IndexNotReadyError
 from engine.base_client.search import BaseSearcher
 from engine.base_client.upload import BaseUploader
+from engine.base_client.utils import BatchUploadError
 
 
 class IncompatibilityError(Exception):
@@ -13,5 +15,8 @@ __all__ = [
     "BaseConfigurator",
     "BaseSearcher",
     "BaseUploader",
+    "BatchUploadError",
     "IncompatibilityError",
+    "IndexBuildError",
+    "IndexNotReadyError",
 ]
@@ -0,0 +1,81 @@
+import contextlib
+import os
+from typing import List, Optional, Set, Tuple, Union
+
+AFFINITY_AUTO = "auto"
+
+
+def _check_supported():
+    if not hasattr(os, "sched_setaffinity"):
+        raise ValueError("CPU affinity is not supported on this platform")
+
+
+def plan_affinity(
+    config: Union[str, dict], processes: int
+) -> Tuple[Set[int], List[Set[int]]]:
+    """
+    Decides which cores the main process and every pool worker run on.
+
+    :param config: "auto" or a dict, either the automatic layout
+        `{"cores": [0, 1, 2, 3], "reserve": 1}`: the first `reserve` cores are
+        left to the main process (tqdm, scheduling, result collection) and the
+        workers are spread over the rest one per core, or an explicit layout
+        `{"parent": [0], "workers": [1, 2, [3, 4]]}`: a core or a set of cores
+        for every worker, reused round-robin if there are more workers.
+    :param processes: number of pool workers, 0 for an in-process run
+    :return: cores of the main process and of every worker
+    """
+    _check_supported()
+    if config == AFFINITY_AUTO:
+        config = {}
+    if not isinstance(config, dict):
+        raise ValueError(f"Unknown CPU affinity: <{config}>")
+
+    available = sorted(os.sched_getaffinity(0))
+
+    if "workers" in config:
+        parent = set(config.get("parent", available))
+        workers = [
+            {cores} if isinstance(cores, int) else set(cores)
+            for cores in config["workers"]
+        ]
+        if not workers:
+            raise ValueError("CPU affinity needs at least one worker core set")
+        return parent, [workers[i % len(workers)] for i in range(processes)]
+
+    cores = list(config.get("cores", available))
+    reserve = config.get("reserve", 1)
+    if processes == 0 or reserve >= len(cores):
+        # Nothing to separate, keep everybody on the same cores
+        parent, spread = set(cores), cores
+    else:
+        parent, spread = set(cores[:reserve]), cores[reserve:]
+    return parent, [{spread[i % len(spread)]} for i in range(processes)]
+
+
+def pin(cores: Set[int]):
+    os.sched_setaffinity(0, cores)
+
+
+@contextlib.contextmanager
+def pinned(cores: Optional[Set[int]]):
+    """
+    Pins the current process to the cores and restores its previous
+    affinity on exit. Does nothing if `cores` is None.
+    """
+    if cores is None:
+        yield
+        return
+    previous = os.sched_getaffinity(0)
+    pin(cores)
+    try:
+        yield
+    finally:
+        pin(previous)
+
+
+def describe(parent: Set[int], workers: List[Set[int]]) -> dict:
+    return {
+        "parent": sorted(parent),
+        "workers": [sorted(cores) for cores in workers],
+    }
@@ -0,0 +1,127 @@
+import json
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from dataset_reader.base_reader import Record
+
+# Approximate size of a float written as JSON, most engines take JSON bodies
+JSON_FLOAT_BYTES = 20
+
+
+def record_bytes(record: Record) -> int:
+    """
+    Estimated size of the record in a JSON request body
+    """
+    size = 0
+    if record.vector is not None:
+        size += len(record.vector) * JSON_FLOAT_BYTES
+    if record.sparse_vector is not None:
+        # An index and a value per entry
+        size += len(record.sparse_vector.indices) * (JSON_FLOAT_BYTES + 8)
+    if record.metadata:
+        size += len(json.dumps(record.metadata, default=str))
+    return size
+
+
+class AdaptiveBatcher:
+    """
+    Cuts the records into batches whose size adapts to the engine: a batch
+    ends when it reaches the current size or `max_bytes` of estimated
+    payload, and every observed latency moves the size, growing it by
+    `step` below the latency band and shrinking it by `step` above it.
+
+    The feedback is taken relative to the size of the observed batch, so the
+    batches still in flight with an outdated size don't compound the change.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        max_bytes: Optional[int] = None,
+        latency: Optional[Tuple[float, float]] = None,
+        min_size: int = 1,
+        max_size: Optional[int] = None,
+        step: float = 2.0,
+    ):
+        if latency is not None and not 0 <= latency[0] <= latency[1]:
+            raise ValueError(f"Invalid latency band: {latency}")
+        if step <= 1:
+            raise ValueError(f"Batch size step must be greater than 1, got {step}")
+        self.min_size = max(1, min_size)
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.latency = latency
+        self.step = step
+        self.initial_size = self.size = self._clamp(batch_size)
+        # Size of every batch, by batch number, and whether the byte budget
+        # cut it short
+        self.sizes: List[int] = []
+        self._byte_limited: List[bool] = []
+
+    @classmethod
+    def from_params(cls, batch_size: int, params: dict) -> "AdaptiveBatcher":
+        latency = params.get("latency", None)
+        return cls(
+            batch_size,
+            max_bytes=params.get("max_bytes", None),
+            latency=tuple(latency) if latency is not None else None,
+            min_size=params.get("min_size", 1),
+            max_size=params.get("max_size", None),
+            step=params.get("step", 2.0),
+        )
+
+    def _clamp(self, size: int) -> int:
+        size = max(self.min_size, size)
+        if self.max_size is not None:
+            size = min(self.max_size, size)
+        return size
+
+    def _cut(self, batch: List[Record], byte_limited: bool) -> List[Record]:
+        self.sizes.append(len(batch))
+        self._byte_limited.append(byte_limited)
+        return batch
+
+    def batches(self, records: Iterable[Record]) -> Iterator[List[Record]]:
+        batch = []
+        batch_bytes = 0
+
+        for record in records:
+            if self.max_bytes is not None:
+                size = record_bytes(record)
+                if batch and batch_bytes + size > self.max_bytes:
+                    yield self._cut(batch, True)
+                    batch = []
+                    batch_bytes = 0
+                batch_bytes += size
+            batch.append(record)
+
+            if len(batch) >= self.size:
+                yield self._cut(batch, False)
+                batch = []
+                batch_bytes = 0
+        if len(batch) > 0:
+            yield self._cut(batch, False)
+
+    def observe(self, batch_id: int, latency: float):
+        """
+        Adjusts the size to the latency of the given batch
+        """
+        if self.latency is None:
+            return
+        low, high = self.latency
+        size = self.sizes[batch_id]
+        if latency > high:
+            self.size = self._clamp(int(size / self.step))
+        elif latency < low and not self._byte_limited[batch_id]:
+            # Growing a batch the byte budget cut doesn't make it bigger
+            self.size = self._clamp(max(size + 1, int(size * self.step)))
+
+    def stats(self) -> dict:
+        return {
+            "max_bytes": self.max_bytes,
+            "latency": list(self.latency) if self.latency is not None else None,
+            "initial_size": self.initial_size,
+            "final_size": self.size,
+            "mean_size": sum(self.sizes) / len(self.sizes) if self.sizes else None,
+            "byte_limited": sum(self._byte_limited),
+            "sizes": self.sizes,
+        }
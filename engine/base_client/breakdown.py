@@ -0,0 +1,86 @@
+import contextvars
+import time
+from typing import Dict, Optional
+
+from engine.base_client.histogram import LatencyHistogram
+
+ENCODE_DONE = "encode_done"
+RESPONSE_RECEIVED = "response_received"
+DECODE_DONE = "decode_done"
+
+# Phase name -> the mark it ends with, in the order of a request
+PHASES = {
+    "encode_time": ENCODE_DONE,
+    "network_time": RESPONSE_RECEIVED,
+    "decode_time": DECODE_DONE,
+}
+
+# Marks of the query in progress. A context variable, so concurrent asyncio
+# requests of the same process do not overwrite each other's marks
+_marks: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    "phase_marks", default=None
+)
+
+
+def start_marks():
+    _marks.set({})
+
+
+def mark(name: str):
+    marks = _marks.get()
+    if marks is not None:
+        marks[name] = time.perf_counter()
+
+
+def collect_phases(start: float, end: float) -> Optional[Dict[str, float]]:
+    """
+    Splits the time between `start` and `end` by the marks the client set.
+    A phase starts at the previous mark set, so a client which can't tell
+    encoding from sending may set `response_received` only.
+
+    :return: duration of every phase, `other_time` is the time after the last
+        mark, or None if the client set no marks
+    """
+    marks = _marks.get()
+    _marks.set(None)
+    if not marks:
+        return None
+
+    phases = {}
+    previous = start
+    for phase, name in PHASES.items():
+        if name in marks:
+            phases[phase] = marks[name] - previous
+            previous = marks[name]
+    phases["other_time"] = end - previous
+    return phases
+
+
+class PhaseBreakdown:
+    """
+    Aggregates the phases of all the queries, to tell the client encode and
+    decode time from the round-trip to the engine
+    """
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    def record(self, phases: Optional[Dict[str, float]]):
+        if phases is None:
+            return
+        for phase, duration in phases.items():
+            if phase not in self.histograms:
+                self.histograms[phase] = LatencyHistogram()
+            self.histograms[phase].record(duration)
+
+    def stats(self) -> Dict[str, dict]:
+        breakdown = {}
+        for phase, histogram in self.histograms.items():
+            stats = histogram.stats()
+            breakdown[phase] = {
+                "queries": histogram.total,
+                "mean_time": stats["mean_time"],
+                "p50_time": stats["p50_time"],
+                "p99_time": stats["p99_time"],
+            }
+        return breakdown
@@ -0,0 +1,125 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from dataset_reader.base_reader import Record
+
+# Seconds between two writes of the state file
+DEFAULT_SAVE_INTERVAL = 5.0
+
+
+class UploadCheckpoint:
+    """
+    Tracks the acknowledged batches of an upload in a state file, so an
+    interrupted upload can be resumed instead of restarted.
+
+    The batches are acknowledged in any order, the state holds the last
+    record id of the longest run of acknowledged batches from the start.
+    Resuming skips the reader records up to and including that id. The
+    records after it may have been committed already (the batches in flight
+    and the ones acknowledged since the last save), so the uploader writes
+    them with `BaseUploader.replace_batch`.
+    """
+
+    def __init__(self, path: Path, save_interval: float = DEFAULT_SAVE_INTERVAL):
+        self.path = Path(path)
+        self.save_interval = save_interval
+        self.last_id: Optional[int] = None
+        # Records of the contiguous acknowledged batches, including the
+        # ones uploaded before a resume
+        self.records = 0
+        self.resumed_records = 0
+        self.connection_params: Optional[dict] = None
+        # Whether the state of an interrupted upload was loaded
+        self.resumed = False
+        self._batches: Dict[int, Tuple[int, int]] = {}
+        self._acked: Set[int] = set()
+        self._next_batch = 0
+        self._saved_at = 0.0
+
+    def load(self) -> bool:
+        """
+        Reads the state left by an interrupted upload
+
+        :return: whether there is one
+        """
+        if not self.path.exists():
+            return False
+        with open(self.path, "r") as state_fp:
+            state = json.load(state_fp)
+        self.last_id = state["last_id"]
+        self.records = self.resumed_records = state["records"]
+        self.connection_params = state.get("connection_params")
+        self.resumed = True
+        return True
+
+    def save(self):
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as state_fp:
+            json.dump(
+                {
+                    "last_id": self.last_id,
+                    "records": self.records,
+                    "connection_params": self.connection_params,
+                },
+                state_fp,
+            )
+        # A crash while writing leaves the previous state intact
+        os.replace(tmp_path, self.path)
+        self._saved_at = time.perf_counter()
+
+    def remove(self):
+        self.path.unlink(missing_ok=True)
+
+    def skip(self, records: Iterable[Record]) -> Iterator[Record]:
+        """
+        Skips the records uploaded before the interruption
+        """
+        records = iter(records)
+        if self.last_id is not None:
+            for record in records:
+                if record.id == self.last_id:
+                    break
+            else:
+                raise ValueError(
+                    f"Record {self.last_id} of the upload checkpoint"
+                    f" {self.path} is not in the dataset"
+                )
+        yield from records
+
+    def track(self, batches: Iterable[List[Record]]) -> Iterator[List[Record]]:
+        """
+        Remembers the size and the last record id of every batch, by number
+        """
+        for batch_id, batch in enumerate(batches):
+            self._batches[batch_id] = (len(batch), batch[-1].id)
+            yield batch
+
+    def ack(self, batch_id: int, latency: float = None):
+        self._acked.add(batch_id)
+        advanced = False
+        while self._next_batch in self._acked:
+            self._acked.remove(self._next_batch)
+            size, self.last_id = self._batches.pop(self._next_batch)
+            self.records += size
+            self._next_batch += 1
+            advanced = True
+        if advanced and time.perf_counter() - self._saved_at >= self.save_interval:
+            self.save()
+
+    def stats(self) -> dict:
+        return {
+            "path": str(self.path),
+            "resumed_records": self.resumed_records,
+            "records": self.records,
+            "last_id": self.last_id,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # Keeps the progress made before a failure
+        self.save()
@@ -0,0 +1,193 @@
+import itertools
+import random
+import time
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+from dataset_reader.base_reader import Query, Record
+from engine.base_client.search import BaseSearcher
+from engine.base_client.upload import BaseUploader
+from engine.base_client.utils import iter_batches
+
+CYCLE_FIELDS = ("mean_precisions", "mean_time", "p99_time")
+
+
+def _write(
+    uploader: BaseUploader,
+    records: Dict[int, Record],
+    ids: List[int],
+    batch_size: int,
+    deleted: Set[int],
+):
+    """
+    Uploads the records back, each batch is removed from `deleted` once its
+    request succeeded
+    """
+    for batch in iter_batches(ids, batch_size):
+        uploader.upload_batch([records[i] for i in batch])
+        deleted.difference_update(batch)
+
+
+def _delete(uploader: BaseUploader, ids: List[int], batch_size: int, deleted: Set[int]):
+    """
+    Deletes the records, each batch is added to `deleted` once its request
+    succeeded
+    """
+    for batch in iter_batches(ids, batch_size):
+        uploader.delete_batch(batch)
+        deleted.update(batch)
+
+
+def _plan(
+    ids: List[int],
+    initial_deletes: int,
+    cycles: int,
+    reinserts: int,
+    deletes: int,
+    rng: random.Random,
+) -> Tuple[List[int], List[Tuple[List[int], List[int]]]]:
+    """
+    Draws the records to churn upfront, so only the records the workload
+    touches have to be kept in memory
+
+    :return: ids deleted before the first cycle, and the ids reinserted and
+        deleted in every cycle
+    """
+    present = list(ids)
+    rng.shuffle(present)
+    initial_deletes = min(initial_deletes, len(present))
+    deleted, present = present[:initial_deletes], present[initial_deletes:]
+    initial = list(deleted)
+    cycle_plan = []
+    for _ in range(cycles):
+        rng.shuffle(deleted)
+        restored = deleted[:reinserts]
+        rng.shuffle(present)
+        removed, present = present[:deletes], present[deletes:]
+        deleted = deleted[reinserts:] + removed
+        present += restored
+        cycle_plan.append((restored, removed))
+    return initial, cycle_plan
+
+
+def churn_search(
+    searcher: BaseSearcher,
+    uploader: BaseUploader,
+    distance,
+    read_queries: Callable[[], Iterable[Query]],
+    read_records: Callable[[], Iterable[Record]],
+) -> dict:
+    """
+    Measures how the index copes with repeated deletes and reinserts of the
+    uploaded collection.
+
+    The workload is described by the "churn" key of the search params, e.g.:
+    {
+        "initial_deletes": 1000,  # records deleted before the first cycle
+        "cycles": 100,
+        "reinserts": 500,  # deleted records uploaded back in every cycle
+        "deletes": 500,  # other records deleted in every cycle
+        "queries": 1000,  # queries searched after every cycle, all by default
+        "seed": 42
+    }
+
+    After every cycle the uploader waits for the engine to finish indexing
+    (`index_ready`) and the searches run. The precision is measured against
+    the ground truth of the full dataset, so the records missing at the time
+    count as misses, as in the original HNSW update benchmark.
+
+    The deleted records are uploaded back at the end, so the search configs
+    running after this one search the full collection. Only the ids of the
+    dataset and the records the workload deletes are kept in memory, the
+    dataset is read twice instead.
+
+    :return: search stats of the last cycle with the per-cycle precision and
+        time-to-stable-index under the "churn" key
+    """
+    churn = searcher.search_params["churn"]
+    cycles = churn.get("cycles", 100)
+    reinserts = churn.get("reinserts", 500)
+    deletes = churn.get("deletes", 500)
+    num_queries = churn.get("queries", None)
+    batch_size = uploader.upload_params.get("batch_size", 64)
+    rng = random.Random(churn.get("seed"))
+
+    def search() -> dict:
+        return searcher.search_all(
+            distance, itertools.islice(read_queries(), num_queries)
+        )
+
+    # Only the ids of the whole dataset, ids are not required to be
+    # contiguous
+    initial, cycle_plan = _plan(
+        [record.id for record in read_records()],
+        churn.get("initial_deletes", 1000),
+        cycles,
+        reinserts,
+        deletes,
+        rng,
+    )
+    touched = set(initial).union(*(removed for _, removed in cycle_plan))
+    records = {record.id: record for record in read_records() if record.id in touched}
+
+    uploader.init_client(
+        uploader.host, distance, uploader.connection_params, uploader.upload_params
+    )
+    try:
+        # Ids whose delete succeeded and which are not uploaded back yet
+        deleted: Set[int] = set()
+        try:
+            initial_stats = search()
+            _delete(uploader, initial, batch_size, deleted)
+            uploader.wait_index_ready()
+            stats = search()
+            history = [
+                {
+                    "cycle": 0,
+                    "deleted": len(deleted),
+                    "missing": len(deleted),
+                    **{field: stats[field] for field in CYCLE_FIELDS},
+                }
+            ]
+
+            total_indexing_time = 0.0
+            for cycle, (restored, removed) in enumerate(cycle_plan, start=1):
+                start = time.perf_counter()
+                _write(uploader, records, restored, batch_size, deleted)
+                _delete(uploader, removed, batch_size, deleted)
+                write_time = time.perf_counter() - start
+                time_to_stable = uploader.wait_index_ready()
+                total_indexing_time += time_to_stable
+
+                print(f"Churn cycle {cycle}: time to stable index {time_to_stable}")
+                stats = search()
+                history.append(
+                    {
+                        "cycle": cycle,
+                        "reinserted": len(restored),
+                        "deleted": len(removed),
+                        "missing": len(deleted),
+                        "write_time": write_time,
+                        "time_to_stable": time_to_stable,
+                        **{field: stats[field] for field in CYCLE_FIELDS},
+                    }
+                )
+        finally:
+            # The following search configs get the full collection back. A
+            # failed request may have been applied partially, so the records
+            # are replaced rather than inserted
+            for batch in iter_batches(sorted(deleted), batch_size):
+                uploader.replace_batch([records[i] for i in batch])
+            uploader.wait_index()
+    finally:
+        uploader.delete_client()
+
+    return {
+        **stats,
+        "churn": {
+            "initial_precision": initial_stats["mean_precisions"],
+            "precision_before_cycles": history[0]["mean_precisions"],
+            "precision_after_cycles": stats["mean_precisions"],
+            "total_indexing_time": total_indexing_time,
+            "cycles": history,
+        },
+    }
@@ -3,14 +3,27 @@ import os
 from datetime import datetime
 from typing import List, Optional
 
-from benchmark import ROOT_DIR
+from benchmark import DATASETS_DIR, ROOT_DIR
+from benchmark.config_read import read_dataset_config
 from benchmark.dataset import Dataset
+from dataset_reader.trace_reader import TraceReader
+from engine.base_client.checkpoint import UploadCheckpoint
+from engine.base_client.churn import churn_search
 from engine.base_client.configure import BaseConfigurator
+from engine.base_client.drift import drift_search
+from engine.base_client.mixed import mixed_search
 from engine.base_client.search import BaseSearcher
+from engine.base_client.sweep import sweep_search
 from engine.base_client.upload import BaseUploader
+from engine.base_client.worker_pool import WorkerPoolCache
+
+# Search workloads which run a single config of their own, so they can't be
+# ramped by a sweep
+WORKLOADS = ("mixed", "churn", "drift")
 
 RESULTS_DIR = ROOT_DIR / "results"
 RESULTS_DIR.mkdir(exist_ok=True)
+CHECKPOINTS_DIR = RESULTS_DIR / "checkpoints"
 
 DETAILED_RESULTS = bool(int(os.getenv("DETAILED_RESULTS", False)))
 
@@ -61,6 +74,33 @@ class BaseClient:
             )
         return result_path
 
+    def save_sweep_results(
+        self, dataset_name: str, summary: dict, search_id: int, search_params: dict
+    ):
+        now = datetime.now()
+        timestamp = now.strftime("%Y-%m-%d-%H-%M-%S")
+        experiments_file = (
+            f"{self.name}-{dataset_name}-sweep-{search_id}-{timestamp}.json"
+        )
+        result_path = RESULTS_DIR / experiments_file
+        with open(result_path, "w") as out:
+            out.write(
+                json.dumps(
+                    {
+                        "params": {
+                            "dataset": dataset_name,
+                            "experiment": self.name,
+                            "engine": self.engine,
+                            "collection_params": self.configurator.collection_params,
+                            **search_params,
+                        },
+                        "results": summary,
+                    },
+                    indent=2,
+                )
+            )
+        return result_path
+
     def save_upload_results(
         self, dataset_name: str, results: dict, upload_params: dict
     ):
@@ -86,7 +126,11 @@ class BaseClient:
         skip_search: bool = False,
         skip_if_exists: bool = True,
         skip_configure: Optional[bool] = False,
+        resume_upload: bool = False,
     ):
+        # Before the upload, which may take hours
+        self._check_search_params()
+
         execution_params = self.configurator.execution_params(
             distance=dataset.config.distance, vector_size=dataset.config.vector_size
         )
@@ -103,22 +147,36 @@ class BaseClient:
                 return
 
         if not skip_upload:
-            if not skip_configure:
+            CHECKPOINTS_DIR.mkdir(exist_ok=True)
+            checkpoint = UploadCheckpoint(
+                CHECKPOINTS_DIR / f"{self.name}-{dataset.config.name}-upload.json"
+            )
+            if resume_upload and checkpoint.load():
+                # Configuring would drop the uploaded records
+                print(
+                    f"Experiment stage: Resume upload after {checkpoint.records}"
+                    f" records (id {checkpoint.last_id})"
+                )
+                if checkpoint.connection_params:
+                    self._set_connection_params(checkpoint.connection_params)
+            elif not skip_configure:
                 print("Experiment stage: Configure")
                 self.configurator.configure(dataset)
                 # Some engines (e.g. ManticoreSearch) may decide/adjust runtime
                 # connection params during configure (like generating a fallback
                 # table name). Propagate any updates to uploader/searchers so
                 # child processes use the same target.
-                updated_connection_params = dict(getattr(self.configurator, "connection_params", {}) or {})
+                updated_connection_params = dict(
+                    getattr(self.configurator, "connection_params", {}) or {}
+                )
                 if updated_connection_params:
-                    self.uploader.connection_params = dict(updated_connection_params)
-                    for searcher in self.searchers:
-                        searcher.connection_params = dict(updated_connection_params)
+                    self._set_connection_params(updated_connection_params)
 
             print("Experiment stage: Upload")
             upload_stats = self.uploader.upload(
-                distance=dataset.config.distance, records=reader.read_data()
+                distance=dataset.config.distance,
+                records=reader.read_data(),
+                checkpoint=checkpoint,
             )
 
             if not DETAILED_RESULTS:
@@ -141,34 +199,129 @@ class BaseClient:
 
         if not skip_search:
             print("Experiment stage: Search")
-            for search_id, searcher in enumerate(self.searchers):
+            # The worker processes are started once and reconfigured for
+            # every search config
+            with WorkerPoolCache() as worker_pools:
+                for searcher in self.searchers:
+                    searcher.worker_pools = worker_pools
+                try:
+                    self._run_searches(dataset, reader, skip_if_exists)
+                finally:
+                    for searcher in self.searchers:
+                        searcher.worker_pools = None
+        print("Experiment stage: Done")
+        print("Results saved to: ", RESULTS_DIR)
+
+    def _check_search_params(self):
+        for searcher in self.searchers:
+            workloads = [key for key in WORKLOADS if key in searcher.search_params]
+            if "sweep" in searcher.search_params and workloads:
+                raise ValueError(
+                    f"Sweep can't be combined with the {workloads[0]} workload"
+                )
+
+    def _set_connection_params(self, connection_params: dict):
+        self.uploader.connection_params = dict(connection_params)
+        for searcher in self.searchers:
+            searcher.connection_params = dict(connection_params)
 
-                if skip_if_exists:
-                    glob_pattern = (
-                        f"{self.name}-{dataset.config.name}-search-{search_id}-*.json"
+    def _run_searches(self, dataset: Dataset, reader, skip_if_exists: bool):
+        for search_id, searcher in enumerate(self.searchers):
+
+            if skip_if_exists:
+                glob_pattern = (
+                    f"{self.name}-{dataset.config.name}-search-{search_id}-*.json"
+                )
+                existing_results = list(RESULTS_DIR.glob(glob_pattern))
+                print("Pattern", glob_pattern, "Results:", existing_results)
+                if len(existing_results) >= 1:
+                    print(
+                        f"Skipping search {search_id} as it already exists",
                     )
-                    existing_results = list(RESULTS_DIR.glob(glob_pattern))
-                    print("Pattern", glob_pattern, "Results:", existing_results)
-                    if len(existing_results) >= 1:
-                        print(
-                            f"Skipping search {search_id} as it already exists",
-                        )
-                        continue
+                    continue
 
+            if "mixed" in searcher.search_params:
+                # Searches while the uploader keeps writing into the collection
                 search_params = {**searcher.search_params}
-                search_stats = searcher.search_all(
-                    dataset.config.distance, reader.read_queries()
+                search_stats = mixed_search(
+                    searcher,
+                    self.uploader,
+                    dataset.config.distance,
+                    reader.read_queries,
+                    reader.read_data,
                 )
-                if not DETAILED_RESULTS:
-                    # Remove verbose stats from search results
-                    search_stats.pop("latencies", None)
-                    search_stats.pop("precisions", None)
-
-                self.save_search_results(
-                    dataset.config.name, search_stats, search_id, search_params
+            elif "churn" in searcher.search_params:
+                # Deletes and reinserts records of the uploaded collection
+                search_params = {**searcher.search_params}
+                search_stats = churn_search(
+                    searcher,
+                    self.uploader,
+                    dataset.config.distance,
+                    reader.read_queries,
+                    reader.read_data,
                 )
-        print("Experiment stage: Done")
-        print("Results saved to: ", RESULTS_DIR)
+            elif "drift" in searcher.search_params:
+                # Replaces the collection with another dataset while searching
+                search_params = {**searcher.search_params}
+                new_reader = self._drift_reader(
+                    dataset, searcher.search_params["drift"]["dataset"]
+                )
+                search_stats = drift_search(
+                    searcher,
+                    self.uploader,
+                    dataset.config.distance,
+                    reader.read_queries,
+                    reader.read_data,
+                    new_reader.read_queries,
+                    new_reader.read_data,
+                )
+            elif "sweep" in searcher.search_params:
+                search_stats, search_params, sweep_summary = sweep_search(
+                    searcher, dataset.config.distance, reader.read_queries
+                )
+                self.save_sweep_results(
+                    dataset.config.name,
+                    sweep_summary,
+                    search_id,
+                    {**searcher.search_params},
+                )
+            else:
+                search_params = {**searcher.search_params}
+                queries = reader.read_queries()
+                if "replay" in searcher.search_params:
+                    # Production traffic recorded against the same collection
+                    queries = TraceReader(
+                        DATASETS_DIR / searcher.search_params["replay"]["trace"],
+                        normalize=self._normalize(dataset),
+                    ).read_queries()
+                search_stats = searcher.search_all(dataset.config.distance, queries)
+            if not DETAILED_RESULTS:
+                # Remove verbose stats from search results
+                search_stats.pop("latencies", None)
+                search_stats.pop("precisions", None)
+
+            self.save_search_results(
+                dataset.config.name, search_stats, search_id, search_params
+            )
+
+    def _drift_reader(self, dataset: Dataset, name: str):
+        new_dataset = Dataset(read_dataset_config()[name])
+        if (
+            new_dataset.config.distance != dataset.config.distance
+            or new_dataset.config.vector_size != dataset.config.vector_size
+        ):
+            raise ValueError(
+                f"Drift dataset {name} must have the same distance and vector size"
+                f" as {dataset.config.name}"
+            )
+        new_dataset.download()
+        return new_dataset.get_reader(self._normalize(dataset))
+
+    def _normalize(self, dataset: Dataset) -> bool:
+        execution_params = self.configurator.execution_params(
+            distance=dataset.config.distance, vector_size=dataset.config.vector_size
+        )
+        return execution_params.get("normalize", False)
 
     def delete_client(self):
         self.uploader.delete_client()
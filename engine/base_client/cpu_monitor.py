@@ -0,0 +1,127 @@
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Share of a core (or of the whole host) above which the client is considered
+# to be the bottleneck of the benchmark
+CLIENT_CPU_SATURATION = float(os.getenv("CLIENT_CPU_SATURATION", 0.9))
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def read_process(pid: int) -> Optional[Tuple[float, int]]:
+    """
+    :return: CPU time (user + system, in seconds) and the number of
+        involuntary context switches of the process, None if it is gone or
+        there is no /proc
+    """
+    try:
+        with open(f"/proc/{pid}/stat") as stat_file:
+            stat = stat_file.read()
+        # The command name may contain spaces, the fields follow the last ")"
+        fields = stat[stat.rindex(")") + 2 :].split()
+        cpu_time = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+        switches = 0
+        with open(f"/proc/{pid}/status") as status_file:
+            for line in status_file:
+                if line.startswith("nonvoluntary_ctxt_switches:"):
+                    switches = int(line.split()[1])
+        return cpu_time, switches
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def read_host() -> Optional[Tuple[int, int]]:
+    """
+    :return: busy and total CPU time of the host, in clock ticks
+    """
+    try:
+        with open("/proc/stat") as stat_file:
+            ticks = [int(value) for value in stat_file.readline().split()[1:]]
+    except (OSError, ValueError):
+        return None
+    # idle and iowait
+    idle = ticks[3] + (ticks[4] if len(ticks) > 4 else 0)
+    return sum(ticks) - idle, sum(ticks)
+
+
+class CpuMonitor:
+    """
+    Measures how busy the benchmark client was during the timed window.
+
+    A closed-loop client mostly waits for the engine, so a client process
+    which keeps a core busy, or a host with no idle CPU left, means the
+    measured RPS is limited by the client, not by the engine.
+    """
+
+    def __init__(self, parent_pid: int, worker_pids: List[int]):
+        self.parent_pid = parent_pid
+        self.worker_pids = worker_pids
+        self._start = None
+        self._processes: Dict[int, Tuple[float, int]] = {}
+        self._host = None
+
+    def start(self):
+        self._start = time.perf_counter()
+        self._host = read_host()
+        self._processes = {}
+        for pid in [self.parent_pid, *self.worker_pids]:
+            sample = read_process(pid)
+            if sample is not None:
+                self._processes[pid] = sample
+
+    def _usage(self, pid: int, elapsed: float) -> Optional[Tuple[float, int]]:
+        before = self._processes.get(pid)
+        after = read_process(pid)
+        if before is None or after is None:
+            return None
+        return (after[0] - before[0]) / elapsed, after[1] - before[1]
+
+    def stop(self) -> dict:
+        """
+        :return: CPU utilisation (1.0 is one fully busy core) and involuntary
+            context switches of the client processes, empty without /proc
+        """
+        elapsed = time.perf_counter() - self._start
+        parent = self._usage(self.parent_pid, elapsed)
+        if parent is None or elapsed <= 0:
+            return {}
+
+        workers = [self._usage(pid, elapsed) for pid in self.worker_pids]
+        workers = [usage for usage in workers if usage is not None]
+
+        host_utilisation = None
+        host = read_host()
+        if self._host is not None and host is not None:
+            busy, total = host[0] - self._host[0], host[1] - self._host[1]
+            host_utilisation = busy / total if total > 0 else None
+
+        stats = {
+            "cpus": os.cpu_count(),
+            "host_cpu_utilisation": host_utilisation,
+            "parent_cpu_utilisation": parent[0],
+            "parent_involuntary_context_switches": parent[1],
+        }
+        if workers:
+            stats.update(
+                {
+                    "mean_worker_cpu_utilisation": sum(u for u, _ in workers)
+                    / len(workers),
+                    "max_worker_cpu_utilisation": max(u for u, _ in workers),
+                    "worker_involuntary_context_switches": sum(s for _, s in workers),
+                }
+            )
+
+        reasons = []
+        if host_utilisation is not None and host_utilisation >= CLIENT_CPU_SATURATION:
+            reasons.append(f"host CPU is {host_utilisation:.0%} busy")
+        if parent[0] >= CLIENT_CPU_SATURATION:
+            reasons.append(f"main process uses {parent[0]:.0%} of a core")
+        if workers and stats["max_worker_cpu_utilisation"] >= CLIENT_CPU_SATURATION:
+            reasons.append(
+                f"a client process uses {stats['max_worker_cpu_utilisation']:.0%} of a core"
+            )
+        stats["saturated"] = bool(reasons)
+        stats["saturation_reasons"] = reasons
+        return stats
@@ -0,0 +1,164 @@
+import itertools
+import threading
+import time
+from typing import Callable, Iterable, List, Optional
+
+from dataset_reader.base_reader import Query, Record
+from engine.base_client.search import BaseSearcher
+from engine.base_client.upload import BaseUploader
+from engine.base_client.utils import iter_batches
+
+ROUND_FIELDS = ("mean_precisions", "rps", "mean_time", "p99_time")
+
+
+def _mean(rounds: List[dict], field: str) -> Optional[float]:
+    if not rounds:
+        return None
+    return sum(entry[field] for entry in rounds) / len(rounds)
+
+
+class Transition:
+    """
+    Replaces the records of the collection with the ones of another dataset
+    in a background thread: every batch of the new records is uploaded after
+    the old records with the same ids are deleted, the old records left over
+    are deleted at the end.
+    """
+
+    def __init__(
+        self,
+        uploader: BaseUploader,
+        old_ids: Iterable[int],
+        new_records: Iterable[Record],
+        batch_size: int,
+    ):
+        self.uploader = uploader
+        self.old_ids = set(old_ids)
+        self.new_records = new_records
+        self.batch_size = batch_size
+        self.uploaded = 0
+        self.deleted = 0
+        self.start = self.end = None
+        self._done = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def start_thread(self):
+        self.start = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _delete(self, ids: List[int]):
+        for batch in iter_batches(ids, self.batch_size):
+            self.uploader.delete_batch(batch)
+            self.deleted += len(batch)
+
+    def _run(self):
+        try:
+            for batch in iter_batches(self.new_records, self.batch_size):
+                replaced = [record.id for record in batch if record.id in self.old_ids]
+                if replaced:
+                    self._delete(replaced)
+                    self.old_ids.difference_update(replaced)
+                self.uploader.upload_batch(batch)
+                self.uploaded += len(batch)
+            self._delete(sorted(self.old_ids))
+            self.old_ids.clear()
+        except BaseException as e:
+            self._error = e
+        finally:
+            self.end = time.perf_counter()
+            self._done.set()
+
+    def join(self):
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+
+def drift_search(
+    searcher: BaseSearcher,
+    uploader: BaseUploader,
+    distance,
+    read_queries: Callable[[], Iterable[Query]],
+    read_records: Callable[[], Iterable[Record]],
+    read_new_queries: Callable[[], Iterable[Query]],
+    read_new_records: Callable[[], Iterable[Record]],
+) -> dict:
+    """
+    Streams a second dataset into the uploaded collection while deleting the
+    records of the first one, and keeps searching the queries of the second
+    dataset during the transition.
+
+    The workload is described by the "drift" key of the search params, e.g.:
+    {
+        "dataset": "laion-small-clip-no-filters-2",  # dataset to stream in
+        "batch_size": 500,  # defaults to the upload batch size
+        "queries": 1000  # queries of a search round, all by default
+    }
+
+    :return: search stats of the final round, after the index got stable,
+        with the rounds run during the transition under the "drift" key
+    """
+    drift = searcher.search_params["drift"]
+    num_queries = drift.get("queries", None)
+    batch_size = drift.get("batch_size", uploader.upload_params.get("batch_size", 64))
+
+    def search(read: Callable[[], Iterable[Query]]) -> dict:
+        return searcher.search_all(distance, itertools.islice(read(), num_queries))
+
+    initial_stats = search(read_queries)
+
+    uploader.init_client(
+        uploader.host, distance, uploader.connection_params, uploader.upload_params
+    )
+    try:
+        transition = Transition(
+            uploader,
+            (record.id for record in read_records()),
+            read_new_records(),
+            batch_size,
+        )
+        transition.start_thread()
+        rounds = []
+        try:
+            while not transition.done:
+                stats = search(read_new_queries)
+                rounds.append(
+                    {
+                        "time": time.perf_counter() - transition.start,
+                        "uploaded": transition.uploaded,
+                        "deleted": transition.deleted,
+                        **{field: stats[field] for field in ROUND_FIELDS},
+                    }
+                )
+        finally:
+            transition.join()
+        transition_time = transition.end - transition.start
+        time_to_stable = uploader.wait_index_ready()
+    finally:
+        uploader.delete_client()
+
+    stats = search(read_new_queries)
+    return {
+        **stats,
+        "drift": {
+            "dataset": drift["dataset"],
+            "initial_precision": initial_stats["mean_precisions"],
+            "final_precision": stats["mean_precisions"],
+            "uploaded": transition.uploaded,
+            "deleted": transition.deleted,
+            "transition_time": transition_time,
+            "write_rps": (
+                transition.uploaded / transition_time if transition_time > 0 else None
+            ),
+            "time_to_stable": time_to_stable,
+            "mean_transition_rps": _mean(rounds, "rps"),
+            "mean_transition_precision": _mean(rounds, "mean_precisions"),
+            "rounds": rounds,
+        },
+    }
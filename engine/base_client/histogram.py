@@ -0,0 +1,155 @@
+import base64
+import json
+import math
+import zlib
+from typing import Dict, Iterable
+
+PERCENTILES = {
+    "p50_time": 50,
+    "p95_time": 95,
+    "p99_time": 99,
+    "p99_9_time": 99.9,
+    "p99_99_time": 99.99,
+}
+# Keys of the latency statistics
+STATS_KEYS = ("mean_time", "std_time", "min_time", "max_time", *PERCENTILES)
+
+
+class LatencyHistogram:
+    """
+    Fixed-memory latency histogram in the spirit of HdrHistogram.
+
+    Values are put into logarithmic buckets, each one wider than the previous by
+    a constant ratio. Any recorded value is therefore known with the same
+    relative error (0.1% for 3 significant figures), whatever its magnitude,
+    and the memory is bounded by the number of buckets between `lowest` and
+    `highest`, not by the number of recorded values.
+
+    Only non-empty buckets are stored. Histograms recorded by different
+    processes are merged by adding up their counts.
+    """
+
+    def __init__(
+        self,
+        significant_figures: int = 3,
+        lowest: float = 1e-6,
+        highest: float = 3600.0,
+    ):
+        self.significant_figures = significant_figures
+        self.lowest = lowest
+        self.highest = highest
+        # The representative value is in the middle of the bucket, so its
+        # relative error is a half of the bucket width
+        self._log_ratio = math.log1p(2 * 10**-significant_figures)
+        self._max_index = int(math.log(highest / lowest) / self._log_ratio) + 1
+
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.sum = 0.0
+        self.sum_squares = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _index(self, value: float) -> int:
+        if value <= self.lowest:
+            return 0
+        index = int(math.log(value / self.lowest) / self._log_ratio) + 1
+        return min(index, self._max_index)
+
+    def _value(self, index: int) -> float:
+        if index == 0:
+            return self.lowest
+        return self.lowest * math.exp((index - 0.5) * self._log_ratio)
+
+    def record(self, value: float):
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+        self.sum += value
+        self.sum_squares += value * value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def record_many(self, values: Iterable[float]):
+        for value in values:
+            self.record(value)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        if (
+            self.significant_figures,
+            self.lowest,
+            self.highest,
+        ) != (other.significant_figures, other.lowest, other.highest):
+            raise ValueError("Can't merge histograms with different buckets")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self.sum += other.sum
+        self.sum_squares += other.sum_squares
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def value_at_percentile(self, percentile: float) -> float:
+        if self.total == 0:
+            raise ValueError("Histogram is empty")
+        target = max(math.ceil(percentile / 100 * self.total), 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(max(self._value(index), self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.total
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(max(self.sum_squares / self.total - self.mean**2, 0.0))
+
+    def stats(self) -> dict:
+        if self.total == 0:
+            return {key: None for key in STATS_KEYS}
+        return {
+            "mean_time": self.mean,
+            "std_time": self.std,
+            "min_time": self.min,
+            "max_time": self.max,
+            **{
+                name: self.value_at_percentile(percentile)
+                for name, percentile in PERCENTILES.items()
+            },
+        }
+
+    def encode(self) -> str:
+        """
+        Compact representation for the result files: compressed JSON of the
+        non-empty buckets, encoded as base64
+        """
+        data = {
+            "significant_figures": self.significant_figures,
+            "lowest": self.lowest,
+            "highest": self.highest,
+            "total": self.total,
+            "sum": self.sum,
+            "sum_squares": self.sum_squares,
+            "min": self.min,
+            "max": self.max,
+            "counts": sorted(self.counts.items()),
+        }
+        compressed = zlib.compress(json.dumps(data).encode(), 9)
+        return base64.b64encode(compressed).decode()
+
+    @classmethod
+    def decode(cls, encoded: str) -> "LatencyHistogram":
+        data = json.loads(zlib.decompress(base64.b64decode(encoded)))
+        histogram = cls(data["significant_figures"], data["lowest"], data["highest"])
+        histogram.counts = {index: count for index, count in data["counts"]}
+        histogram.total = data["total"]
+        histogram.sum = data["sum"]
+        histogram.sum_squares = data["sum_squares"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        return histogram
@@ -0,0 +1,235 @@
+import functools
+import threading
+import time
+import traceback
+from multiprocessing import get_context
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from dataset_reader.base_reader import Query, Record
+from engine.base_client.schedule import InFlightLimiter, iter_arrivals
+from engine.base_client.search import BaseSearcher, latency_stats
+from engine.base_client.timeseries import DEFAULT_WINDOW, TimeSeries
+from engine.base_client.upload import BaseUploader
+from engine.base_client.utils import iter_batches
+from engine.base_client.worker_pool import WorkerPool
+
+
+def _iter_forever(read_records: Callable[[], Iterable[Record]]) -> Iterator[Record]:
+    while True:
+        yield from read_records()
+
+
+def _write_batch(
+    uploader_class, item: Tuple[List[Record], bool]
+) -> Tuple[float, float, int, int]:
+    """
+    :return: latency, completion time, size of the batch and the number of
+        the records deleted before they were written
+    """
+    batch, delete = item
+    start = time.perf_counter()
+    if delete:
+        uploader_class.delete_batch([record.id for record in batch])
+        uploader_class.upload_batch(batch)
+    else:
+        uploader_class.replace_batch(batch)
+    end = time.perf_counter()
+    # Replacing the records of the engines which don't upsert deletes them too
+    deleted = len(batch) if delete or not uploader_class.upserts else 0
+    return end - start, end, len(batch), deleted
+
+
+class BackgroundWriter:
+    """
+    Writes the records of the dataset at a target rate in its own pool of
+    uploader processes, until it is stopped.
+
+    The records are written again with the same ids, so the size of the
+    collection and the ground truth of the queries stay the same, while the
+    engine has to keep indexing. `delete_ratio` of the batches are deleted
+    before they are written, the other ones are upserted. Engines which
+    don't upsert get every batch deleted first, see
+    `BaseUploader.replace_batch`.
+    """
+
+    def __init__(
+        self,
+        uploader: BaseUploader,
+        distance,
+        read_records: Callable[[], Iterable[Record]],
+        write_rps: float,
+        parallel: int = 1,
+        batch_size: int = 64,
+        window: float = DEFAULT_WINDOW,
+        delete_ratio: float = 0.0,
+    ):
+        if not 0 <= delete_ratio <= 1:
+            raise ValueError(f"Delete ratio must be within [0, 1], got {delete_ratio}")
+        self.uploader = uploader
+        self.distance = distance
+        self.read_records = read_records
+        self.write_rps = write_rps
+        self.parallel = parallel
+        self.batch_size = batch_size
+        self.window = window
+        self.delete_ratio = delete_ratio
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[WorkerPool] = None
+        self._results: List[tuple] = []
+        self._error: Optional[BaseException] = None
+        self._start = self._end = None
+
+    def start(self):
+        uploader = self.uploader
+        # The pool is started from the main thread, only feeding it is left
+        # to the background one
+        self._pool = WorkerPool(
+            get_context(uploader.get_mp_start_method()),
+            processes=self.parallel,
+            initializer=uploader.__class__.init_client,
+            initargs=(
+                uploader.host,
+                self.distance,
+                uploader.connection_params,
+                uploader.upload_params,
+            ),
+        )
+        self._pool.wait_ready()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _iter_scheduled(self) -> Iterator[Tuple[List[Record], bool]]:
+        """
+        Releases the batches at `write_rps / batch_size` per second until the
+        writer is stopped, together with whether to delete them first
+        """
+        batches = iter_batches(_iter_forever(self.read_records), self.batch_size)
+        offsets = iter_arrivals(self.write_rps / self.batch_size)
+        for batch_id, (batch, offset) in enumerate(zip(batches, offsets)):
+            delay = self._start + offset - time.perf_counter()
+            if self._stop.wait(max(delay, 0)):
+                return
+            # Spreads the deletes evenly over the batches
+            delete = int((batch_id + 1) * self.delete_ratio) > int(
+                batch_id * self.delete_ratio
+            )
+            yield batch, delete
+
+    def _run(self):
+        # If the engine can't keep up, the writer falls behind the schedule
+        # instead of queueing up batches, see `write_rps` in the stats
+        limiter = InFlightLimiter(self.parallel * 2)
+        self._start = time.perf_counter()
+        try:
+            batches = self._iter_scheduled()
+            results = self._pool.imap_unordered(
+                functools.partial(_write_batch, self.uploader.__class__),
+                limiter.feed(batches),
+            )
+            for result in limiter.results(results):
+                self._results.append(result)
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._end = time.perf_counter()
+
+    def stop(self) -> dict:
+        """
+        Waits for the batches in flight and shuts the pool down
+
+        :return: write stats
+        """
+        self._stop.set()
+        try:
+            if self._thread is not None:
+                self._thread.join()
+        finally:
+            self._pool.pool.terminate()
+        if self._error is not None:
+            raise self._error
+
+        write_time = self._end - self._start
+        time_series = TimeSeries(self.window, self._start)
+        for latency, end, _, _ in self._results:
+            time_series.record(end, latency)
+        latencies = [latency for latency, _, _, _ in self._results]
+        stats = latency_stats(latencies)
+        records = sum(size for _, _, size, _ in self._results)
+        return {
+            "target_write_rps": self.write_rps,
+            "write_time": write_time,
+            "batches": len(self._results),
+            "records": records,
+            "deleted_records": sum(deleted for _, _, _, deleted in self._results),
+            "write_rps": records / write_time if write_time > 0 else 0.0,
+            **{
+                key.replace("_time", "_batch_time"): value
+                for key, value in stats.items()
+            },
+            "time_series": time_series.to_list(self._end),
+        }
+
+
+def mixed_search(
+    searcher: BaseSearcher,
+    uploader: BaseUploader,
+    distance,
+    read_queries: Callable[[], Iterable[Query]],
+    read_records: Callable[[], Iterable[Record]],
+) -> dict:
+    """
+    Runs a search config while the uploader keeps writing into the collection.
+
+    The writes are described by the "mixed" key of the search params, e.g.:
+    {
+        "write_rps": 1000,  # records per second, or
+        "read_write_ratio": 10,  # queries per written record, needs "rps"
+        "parallel": 2,  # uploader processes, defaults to 1
+        "batch_size": 64,  # defaults to the upload batch size
+        "delete_ratio": 0.1  # batches deleted before they are written
+    }
+
+    :return: search stats with the write stats under the "writes" key
+    """
+    mixed = searcher.search_params["mixed"]
+    if "sweep" in searcher.search_params:
+        raise ValueError("Mixed workload does not support sweep")
+    if "write_rps" in mixed:
+        write_rps = mixed["write_rps"]
+    elif "read_write_ratio" in mixed:
+        if "rps" not in searcher.search_params:
+            raise ValueError("Mixed workload read_write_ratio requires the search rps")
+        write_rps = searcher.search_params["rps"] / mixed["read_write_ratio"]
+    else:
+        raise ValueError("Mixed workload needs either write_rps or read_write_ratio")
+
+    writer = BackgroundWriter(
+        uploader,
+        distance,
+        read_records,
+        write_rps,
+        parallel=int(mixed.get("parallel", 1)),
+        batch_size=mixed.get(
+            "batch_size", uploader.upload_params.get("batch_size", 64)
+        ),
+        window=searcher.search_params.get("time_series_window", DEFAULT_WINDOW),
+        delete_ratio=mixed.get("delete_ratio", 0.0),
+    )
+    writer.start()
+    try:
+        stats = searcher.search_all(distance, read_queries())
+    except BaseException:
+        try:
+            writer.stop()
+        except Exception:
+            # The search error is the one to report
+            print("Background writer failed to stop after a search error:")
+            traceback.print_exc()
+        raise
+    writes = writer.stop()
+
+    writes["read_write_ratio"] = (
+        stats["rps"] / writes["write_rps"] if writes["write_rps"] > 0 else None
+    )
+    return {**stats, "writes": writes}
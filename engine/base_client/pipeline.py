@@ -0,0 +1,215 @@
+import functools
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Set, Tuple
+
+from dataset_reader.base_reader import Record
+from engine.base_client.schedule import InFlightLimiter
+from engine.base_client.utils import BatchUploadError, describe_batch
+from engine.base_client.worker_pool import WorkerPool
+
+DEFAULT_QUEUE_SIZE = 16
+
+# Marks the end of the reader output
+_DONE = object()
+
+
+def _upload(
+    encode_batch: Callable[[List[Record]], Any],
+    upload_encoded: Callable[[Any], None],
+    delete_batch: Optional[Callable[[List[int]], None]],
+    item: Tuple[int, List[Record]],
+) -> Tuple[float, float, int, int, float]:
+    """
+    Encodes and sends the batch in the same worker, so the payload is never
+    pickled back through the main process
+
+    :param delete_batch: deletes the records of the batch before sending it,
+        see `BaseUploader.replace_batch`
+
+    :return: latency, completion time, number and size of the batch, and the
+        time it took to encode it
+    """
+    batch_id, batch = item
+    start = time.perf_counter()
+    try:
+        payload = encode_batch(batch)
+    except Exception as e:
+        raise BatchUploadError(
+            f"Encoding of {describe_batch(batch_id, batch)} failed: {e!r}"
+        ) from e
+    encoded = time.perf_counter()
+    try:
+        if delete_batch is not None:
+            delete_batch([record.id for record in batch])
+        upload_encoded(payload)
+    except Exception as e:
+        raise BatchUploadError(
+            f"Upload of {describe_batch(batch_id, batch)} failed: {e!r}"
+        ) from e
+    end = time.perf_counter()
+    return end - encoded, end, batch_id, len(batch), encoded - start
+
+
+def _stage_stats(records: int, busy_time: float, workers: int, wall_time: float):
+    return {
+        "workers": workers,
+        "busy_time": busy_time,
+        # Records per second the stage would sustain if it never waited
+        "capacity_rps": records * workers / busy_time if busy_time > 0 else None,
+        "utilisation": busy_time / (wall_time * workers) if wall_time > 0 else None,
+    }
+
+
+class UploadPipeline:
+    """
+    Upload split into stages connected by a bounded queue:
+
+    * read - a thread of the main process reads the records and cuts them
+      into batches,
+    * encode - the workers turn a batch into the engine-specific wire payload
+      with `encode_batch`,
+    * send - the same workers send the payload with `upload_encoded`.
+
+    Every stage measures the time it was busy, so the stage with the highest
+    utilisation tells whether the ingest is limited by the disk, the client
+    CPU or the engine.
+    """
+
+    def __init__(
+        self,
+        ctx,
+        uploader_class,
+        initargs: tuple,
+        workers: int,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        affinity: Optional[List[Set[int]]] = None,
+        replace: bool = False,
+    ):
+        """
+        :param replace: the records may be in the collection already, see
+            `BaseUploader.replace_batch`
+        """
+        self.ctx = ctx
+        self.uploader_class = uploader_class
+        self.initargs = initargs
+        self.workers = workers
+        self.queue_size = queue_size
+        self.affinity = affinity
+        self.replace = replace
+        self._read_time = 0.0
+        self._error: Optional[BaseException] = None
+        self._stopped = threading.Event()
+
+    def _put(self, out: queue.Queue, item) -> bool:
+        """
+        Blocks while the next stages are behind, unless the upload stopped
+
+        :return: whether the item was queued
+        """
+        while not self._stopped.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _read(self, batches: Iterable[List[Record]], out: queue.Queue):
+        try:
+            start = time.perf_counter()
+            for batch in batches:
+                self._read_time += time.perf_counter() - start
+                if not self._put(out, batch):
+                    return
+                start = time.perf_counter()
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._put(out, _DONE)
+
+    def _iter_batches(self, batches: queue.Queue) -> Iterator[Tuple[int, List[Record]]]:
+        yield from enumerate(iter(batches.get, _DONE))
+        if self._error is not None:
+            raise self._error
+
+    def run(
+        self,
+        batches: Iterable[List[Record]],
+        observe: Optional[Callable[[int, float], None]] = None,
+    ) -> Tuple[List[Tuple[float, float, int]], dict]:
+        """
+        :param batches: batches of the records, read in the reader thread
+        :param observe: called with the number and latency of every sent batch
+        :return: latency, completion time and number of every sent batch,
+            and the stats of every stage
+        """
+        batch_queue = queue.Queue(maxsize=self.queue_size)
+        reader = threading.Thread(
+            target=self._read, args=(batches, batch_queue), daemon=True
+        )
+
+        pool = WorkerPool(
+            self.ctx,
+            processes=self.workers,
+            initializer=self.uploader_class.init_client,
+            initargs=self.initargs,
+            affinity=self.affinity,
+        )
+        try:
+            pool.wait_ready()
+
+            start = time.perf_counter()
+            reader.start()
+            limiter = InFlightLimiter(self.queue_size)
+            upload = functools.partial(
+                _upload,
+                self.uploader_class.encode_batch,
+                self.uploader_class.upload_encoded,
+                (
+                    self.uploader_class.delete_batch
+                    if self.replace and not self.uploader_class.upserts
+                    else None
+                ),
+            )
+            results = []
+            for result in limiter.results(
+                pool.imap_unordered(
+                    upload, limiter.feed(self._iter_batches(batch_queue))
+                )
+            ):
+                if observe is not None:
+                    observe(result[2], result[0])
+                results.append(result)
+            end = time.perf_counter()
+        finally:
+            # Unblocks the reader if a worker failed
+            self._stopped.set()
+            pool.pool.terminate()
+            if reader.is_alive():
+                reader.join()
+
+        wall_time = end - start
+        num_records = sum(size for _, _, _, size, _ in results)
+        stages = {
+            "read": _stage_stats(num_records, self._read_time, 1, wall_time),
+            "encode": _stage_stats(
+                num_records,
+                sum(encode_time for _, _, _, _, encode_time in results),
+                self.workers,
+                wall_time,
+            ),
+            "send": _stage_stats(
+                num_records,
+                sum(latency for latency, _, _, _, _ in results),
+                self.workers,
+                wall_time,
+            ),
+        }
+        return [result[:3] for result in results], {
+            "queue_size": self.queue_size,
+            "records": num_records,
+            "records_per_second": num_records / wall_time if wall_time > 0 else None,
+            "stages": stages,
+        }
@@ -0,0 +1,131 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+# Seconds to wait for an index before giving up
+DEFAULT_TIMEOUT = 6 * 3600.0
+
+
+@dataclass
+class IndexStatus:
+    ready: bool
+    # Indexed and total vectors, for the engines which report the progress
+    indexed: Optional[int] = None
+    total: Optional[int] = None
+    # `perf_counter` time the build completed at, for the engines which
+    # let the client timestamp the completion exactly
+    completed_at: Optional[float] = None
+
+
+class IndexBuildError(Exception):
+    """
+    The engine reported a failed index build
+    """
+
+
+class IndexNotReadyError(TimeoutError):
+    """
+    The index didn't get ready before the timeout
+    """
+
+    def __init__(self, message: str, status: IndexStatus):
+        super().__init__(message)
+        self.status = status
+
+
+class ReadinessPoller:
+    """
+    Polls the status of an index build until it is ready.
+
+    The interval starts at `initial_interval` and grows by `backoff` up to
+    `max_interval` while the status doesn't change, so a build finishing in
+    milliseconds is noticed in milliseconds, and a long one is not flooded
+    with requests. A ready status has to be observed `confirmations` times
+    in a row, `confirmation_interval` apart, because some engines report
+    ready for a moment between two optimization rounds. The confirmations
+    are not part of the time to ready, and neither is the delay between the
+    `completed_at` of a status and the poll which noticed it.
+
+    Raises `IndexNotReadyError` with the last status if the index is not
+    confirmed ready within `timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        initial_interval: float = 0.001,
+        max_interval: float = 1.0,
+        backoff: float = 1.5,
+        confirmations: int = 3,
+        confirmation_interval: float = 0.5,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+    ):
+        if backoff < 1:
+            raise ValueError(f"Backoff must be at least 1, got {backoff}")
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.confirmations = max(1, confirmations)
+        self.confirmation_interval = confirmation_interval
+        self.timeout = timeout
+
+    @classmethod
+    def from_params(cls, params: dict) -> "ReadinessPoller":
+        return cls(**params)
+
+    def poll(self, status: Callable[[], IndexStatus]) -> dict:
+        """
+        :return: time from the call to the first ready observation of the
+            confirmed streak (or to its `completed_at`), time spent since then
+            confirming it, number of polls and the indexing progress, recorded
+            whenever it changed
+        """
+        start = time.perf_counter()
+        interval = self.initial_interval
+        polls = 0
+        progress = []
+        streak = 0
+        first_ready = None
+        last = None
+        while True:
+            current = status()
+            now = time.perf_counter()
+            polls += 1
+            if current.indexed is not None and (
+                not progress
+                or (progress[-1]["indexed"], progress[-1]["total"])
+                != (current.indexed, current.total)
+            ):
+                progress.append(
+                    {
+                        "time": now - start,
+                        "indexed": current.indexed,
+                        "total": current.total,
+                    }
+                )
+
+            if current.ready:
+                streak += 1
+                if first_ready is None:
+                    first_ready = (
+                        now if current.completed_at is None else current.completed_at
+                    )
+                if streak >= self.confirmations:
+                    return {
+                        "time_to_ready": max(0.0, first_ready - start),
+                        "confirmation_time": now - first_ready,
+                        "polls": polls,
+                        "progress": progress,
+                    }
+                time.sleep(self.confirmation_interval)
+                continue
+
+            streak = 0
+            first_ready = None
+            if self.timeout is not None and now - start >= self.timeout:
+                raise IndexNotReadyError(
+                    f"Index not ready after {now - start:.1f} s: {current}", current
+                )
+            if current == last:
+                interval = min(self.max_interval, interval * self.backoff)
+            last = current
+            time.sleep(interval)
@@ -0,0 +1,137 @@
+import random
+import threading
+import time
+from typing import Iterable, Iterator, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+ARRIVAL_FIXED = "fixed"
+ARRIVAL_POISSON = "poisson"
+
+
+def iter_arrivals(
+    rps: float, arrival: str = ARRIVAL_FIXED, seed: Optional[int] = None
+) -> Iterator[float]:
+    """
+    Infinite stream of intended send offsets (in seconds from the start of the run)
+    for an open-loop load with the given target rate.
+
+    :param rps: target requests per second
+    :param arrival: "fixed" - constant interval, "poisson" - exponential intervals
+    :param seed: seed for the poisson arrivals, makes runs reproducible
+    """
+    if rps <= 0:
+        raise ValueError(f"Target rps must be positive, got {rps}")
+
+    interval = 1.0 / rps
+    offset = 0.0
+
+    if arrival == ARRIVAL_FIXED:
+        while True:
+            yield offset
+            offset += interval
+    elif arrival == ARRIVAL_POISSON:
+        rng = random.Random(seed)
+        while True:
+            yield offset
+            offset += rng.expovariate(rps)
+    else:
+        raise ValueError(f"Unknown arrival type: <{arrival}>")
+
+
+def iter_trace_offsets(
+    timestamps: Iterable[Optional[float]], speed: float = 1.0
+) -> Iterator[float]:
+    """
+    Send offsets which keep the inter-arrival times of a recorded trace.
+
+    :param timestamps: send times of the recorded requests, in seconds
+    :param speed: replay speed factor, 2.0 sends the trace twice as fast
+    """
+    if speed <= 0:
+        raise ValueError(f"Replay speed must be positive, got {speed}")
+
+    first = None
+    for timestamp in timestamps:
+        if timestamp is None:
+            raise ValueError("Replay requires a timestamp on every query")
+        if first is None:
+            first = timestamp
+        yield (timestamp - first) / speed
+
+
+def iter_scheduled(
+    items: Iterable[T], offsets: Iterable[float], start: float
+) -> Iterator[Tuple[T, float]]:
+    """
+    Releases every item at its intended send time and yields it together with
+    that time, so the latency can be measured from the moment the request was
+    supposed to leave, not from the moment it actually did.
+
+    Uses `time.perf_counter`, which is a system-wide monotonic clock, so the
+    intended time can be compared with the timestamps taken in pool workers.
+    """
+    for item, offset in zip(items, offsets):
+        scheduled = start + offset
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        yield item, scheduled
+
+
+def iter_until(items: Iterable[T], duration: float) -> Iterator[T]:
+    """
+    Yields the items until the time budget (in seconds) expires
+    """
+    deadline = time.perf_counter() + duration
+    for item in items:
+        if time.perf_counter() >= deadline:
+            return
+        yield item
+
+
+class InFlightLimiter:
+    """
+    Bounds the number of items handed over to a pool but not processed yet.
+
+    `Pool.imap` consumes its input eagerly in a background thread, so an
+    endless or time-bound stream would be queued up faster than the workers
+    are able to process it.
+    """
+
+    def __init__(self, limit: int):
+        self._slots = threading.Semaphore(limit)
+        self._closed = False
+
+    def feed(self, items: Iterable[T]) -> Iterator[T]:
+        for item in items:
+            self._slots.acquire()
+            if self._closed:
+                return
+            yield item
+
+    def results(self, results: Iterable[T]) -> Iterator[T]:
+        try:
+            for result in results:
+                self._slots.release()
+                yield result
+        finally:
+            # Nobody waits for the results anymore (e.g. a task failed), let
+            # the feeder stop, otherwise terminating the pool waits for it
+            self._closed = True
+            self._slots.release()
+
+
+def iter_passes(
+    items: Sequence[T], shuffle: bool = False, seed: Optional[int] = None
+) -> Iterator[T]:
+    """
+    Endlessly repeats the items, optionally in a new random order on every pass
+    """
+    rng = random.Random(seed)
+    order = list(range(len(items)))
+    while order:
+        if shuffle:
+            rng.shuffle(order)
+        for i in order:
+            yield items[i]
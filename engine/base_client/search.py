@@ -1,18 +1,97 @@
+import asyncio
+import contextlib
 import functools
+import itertools
+import os
+import threading
 import time
 from multiprocessing import get_context
-from typing import Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import tqdm
 
 from dataset_reader.base_reader import Query
+from engine.base_client import breakdown
+from engine.base_client.affinity import describe, pinned, plan_affinity
+from engine.base_client.cpu_monitor import CpuMonitor
+from engine.base_client.histogram import PERCENTILES, STATS_KEYS, LatencyHistogram
+from engine.base_client.schedule import (
+    ARRIVAL_FIXED,
+    InFlightLimiter,
+    iter_arrivals,
+    iter_passes,
+    iter_scheduled,
+    iter_trace_offsets,
+    iter_until,
+)
+from engine.base_client.shared_queries import SharedQueries
+from engine.base_client.timeseries import DEFAULT_WINDOW, TimeSeries
+from engine.base_client.utils import iter_batches
+from engine.base_client.worker_pool import (
+    EXECUTOR_PROCESS,
+    EXECUTOR_THREAD,
+    EXECUTORS,
+    ThreadWorkerPool,
+    WorkerPool,
+    WorkerPoolCache,
+)
 
 DEFAULT_TOP = 10
+# How many queries are kept for the duration based warmup, they are cycled
+# and left out of the timed run
+WARMUP_BUFFER = 100
+
+
+SUMMARY_KEYS = ("mean_time", "p50_time", "p99_time", "max_time")
+
+
+class QueryResult(NamedTuple):
+    precision: float
+    latency: float
+    service_time: float
+    # `perf_counter` time the response was received at
+    end: float
+    # Client CPU spent on building the request before the clock started
+    prep_time: float = 0.0
+    # Durations of the request phases, if the client marks them
+    phases: Optional[Dict[str, float]] = None
+
+
+def latency_stats(latencies: Sequence[float]) -> dict:
+    """
+    Exact statistics of the latencies, same keys as `LatencyHistogram.stats`,
+    all None without latencies
+    """
+    if len(latencies) == 0:
+        return {key: None for key in STATS_KEYS}
+    return {
+        "mean_time": np.mean(latencies),
+        "std_time": np.std(latencies),
+        "min_time": np.min(latencies),
+        "max_time": np.max(latencies),
+        **{
+            name: np.percentile(latencies, percentile)
+            for name, percentile in PERCENTILES.items()
+        },
+    }
+
+
+def latency_summary(latencies: Sequence[float]) -> dict:
+    stats = latency_stats(latencies)
+    return {key: stats[key] for key in SUMMARY_KEYS}
 
 
 class BaseSearcher:
     MP_CONTEXT = None
+    # Set by `BaseClient` to reuse the worker processes between search configs
+    worker_pools: Optional[WorkerPoolCache] = None
+    _shared_queries: Optional[SharedQueries] = None
+    _histograms: Optional[Dict[str, LatencyHistogram]] = None
+    _histograms_lock = threading.Lock()
+    # Whether `prepare_query` runs before the clock starts, set by the
+    # "prepare_queries" search param
+    _prepare_queries = False
 
     def __init__(self, host, connection_params, search_params):
         self.host = host
@@ -29,28 +108,498 @@ class BaseSearcher:
     def get_mp_start_method(cls):
         return None
 
+    @classmethod
+    def _init_worker(
+        cls,
+        host: str,
+        distance,
+        connection_params: dict,
+        search_params: dict,
+        shared_queries: Optional[dict] = None,
+    ):
+        cls.init_client(host, distance, connection_params, search_params)
+        cls._reset_histograms(search_params.get("histogram", False))
+        cls._prepare_queries = search_params.get("prepare_queries", False)
+        if shared_queries is not None:
+            cls._shared_queries = SharedQueries.attach(shared_queries)
+
+    @classmethod
+    def init_thread(
+        cls, host: str, distance, connection_params: dict, search_params: dict
+    ):
+        """
+        Called in every thread of the `executor: thread` mode, after the main
+        thread ran `init_client`. The threads share the client by default,
+        clients which are not thread-safe create a per-thread one here.
+        """
+        pass
+
+    @classmethod
+    def _init_thread(
+        cls,
+        host: str,
+        distance,
+        connection_params: dict,
+        search_params: dict,
+        shared_queries: Optional[dict] = None,
+    ):
+        cls.init_thread(host, distance, connection_params, search_params)
+
+    @classmethod
+    def reconfigure_client(
+        cls, host: str, distance, connection_params: dict, search_params: dict
+    ):
+        """
+        Prepares the client of a reused worker process for the next search
+        config. Reconnects by default, clients may override it to only
+        replace the params kept at the class level.
+        """
+        cls.delete_client()
+        cls.init_client(host, distance, connection_params, search_params)
+
+    @classmethod
+    def _reconfigure_worker(
+        cls,
+        host: str,
+        distance,
+        connection_params: dict,
+        search_params: dict,
+        shared_queries: Optional[dict] = None,
+    ) -> float:
+        start = time.perf_counter()
+        cls.reconfigure_client(host, distance, connection_params, search_params)
+        cls._reset_histograms(search_params.get("histogram", False))
+        cls._prepare_queries = search_params.get("prepare_queries", False)
+        if cls._shared_queries is not None:
+            # The memory of the previous run is already unlinked by the parent
+            cls._shared_queries.close()
+            cls._shared_queries = None
+        if shared_queries is not None:
+            cls._shared_queries = SharedQueries.attach(shared_queries)
+        return time.perf_counter() - start
+
+    @classmethod
+    def _reset_histograms(cls, enabled: bool = True):
+        cls._histograms = (
+            {
+                "latency": LatencyHistogram(),
+                "service": LatencyHistogram(),
+                "prep": LatencyHistogram(),
+            }
+            if enabled
+            else None
+        )
+
+    @classmethod
+    def _get_histograms(cls) -> Optional[Dict[str, LatencyHistogram]]:
+        return cls._histograms
+
+    @classmethod
+    def _record(cls, latency: float, service_time: float, prep_time: float = 0.0):
+        if cls._histograms is not None:
+            # Shared by all the threads of the `executor: thread` mode
+            with cls._histograms_lock:
+                cls._histograms["latency"].record(latency)
+                cls._histograms["service"].record(service_time)
+                cls._histograms["prep"].record(prep_time)
+
+    @classmethod
+    def _get_query(cls, query: Union[Query, int]) -> Query:
+        # With shared queries the workers receive only row indices
+        if isinstance(query, Query):
+            return query
+        return cls._shared_queries[query]
+
     @classmethod
     def search_one(cls, query: Query, top: Optional[int]) -> List[Tuple[int, float]]:
         raise NotImplementedError()
 
     @classmethod
-    def _search_one(cls, query: Query, top: Optional[int] = None):
-        if top is None:
-            top = (
-                len(query.expected_result)
-                if query.expected_result is not None and len(query.expected_result) > 0
-                else DEFAULT_TOP
-            )
+    def encode_done(cls):
+        """
+        Optional instrumentation: clients call `encode_done`, `response_received`
+        and `decode_done` inside `search_one` as the request goes through these
+        phases, so the latency can be split into client encode, round-trip and
+        client decode time. Any of the marks may be skipped.
+        """
+        breakdown.mark(breakdown.ENCODE_DONE)
 
-        start = time.perf_counter()
-        search_res = cls.search_one(query, top)
-        end = time.perf_counter()
+    @classmethod
+    def response_received(cls):
+        breakdown.mark(breakdown.RESPONSE_RECEIVED)
+
+    @classmethod
+    def decode_done(cls):
+        breakdown.mark(breakdown.DECODE_DONE)
+
+    @classmethod
+    def prepare_query(cls, query: Query, top: int):
+        """
+        Optional: turns the query into the ready-to-send request payload (e.g.
+        encoded JSON), which is sent by `search_prepared`. With the
+        "prepare_queries" search param it is called before the clock starts,
+        so the measured latency is network and engine time, not the client
+        CPU spent on building and serializing the request.
+        :return: the payload, or None to send the query with `search_one`
+        """
+        return None
+
+    @classmethod
+    def search_prepared(cls, prepared) -> List[Tuple[int, float]]:
+        raise NotImplementedError()
+
+    @classmethod
+    async def search_prepared_async(cls, prepared) -> List[Tuple[int, float]]:
+        raise NotImplementedError()
+
+    @classmethod
+    def search_batch(
+        cls, queries: List[Query], top: int
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        Optional: sends all the queries in a single request, the way the
+        engine's multi-search API is used in production.
+        :return: results of every query, in the order of the queries
+        """
+        raise NotImplementedError()
+
+    @classmethod
+    def init_async_client(cls):
+        """
+        Creates the client used by `search_one_async`. It is called inside the
+        event loop of the process, after `init_client` prepared the connection
+        settings, so the client is bound to the loop it is used in.
+        """
+        raise NotImplementedError()
 
+    @classmethod
+    async def search_one_async(
+        cls, query: Query, top: Optional[int]
+    ) -> List[Tuple[int, float]]:
+        raise NotImplementedError()
+
+    @classmethod
+    async def delete_async_client(cls):
+        pass
+
+    @classmethod
+    def _get_top(cls, query: Query, top: Optional[int]) -> int:
+        if top is not None:
+            return top
+        if query.top is not None:
+            return query.top
+        return (
+            len(query.expected_result)
+            if query.expected_result is not None and len(query.expected_result) > 0
+            else DEFAULT_TOP
+        )
+
+    @classmethod
+    def _precision(
+        cls, query: Query, search_res: List[Tuple[int, float]], top: int
+    ) -> float:
         precision = 1.0
         if query.expected_result:
             ids = set(x[0] for x in search_res)
             precision = len(ids.intersection(query.expected_result[:top])) / top
-        return precision, end - start
+        return precision
+
+    @classmethod
+    def _search_one(
+        cls,
+        query: Query,
+        top: Optional[int] = None,
+        scheduled: Optional[float] = None,
+    ):
+        """
+        Returns precision, latency, service time and completion time of a single query.
+        In the open-loop mode the latency is measured from the intended send
+        time, so it also includes the time the query spent waiting in a queue.
+        """
+        query = cls._get_query(query)
+        top = cls._get_top(query, top)
+
+        prep_start = time.perf_counter()
+        prepared = cls.prepare_query(query, top) if cls._prepare_queries else None
+        breakdown.start_marks()
+        start = time.perf_counter()
+        if prepared is None:
+            search_res = cls.search_one(query, top)
+        else:
+            search_res = cls.search_prepared(prepared)
+        end = time.perf_counter()
+        phases = breakdown.collect_phases(start, end)
+
+        latency = end - (start if scheduled is None else scheduled)
+        cls._record(latency, end - start, start - prep_start)
+        return QueryResult(
+            cls._precision(query, search_res, top),
+            latency,
+            end - start,
+            end,
+            start - prep_start,
+            phases,
+        )
+
+    @classmethod
+    async def _search_one_async(cls, query: Query, top: Optional[int] = None):
+        query = cls._get_query(query)
+        top = cls._get_top(query, top)
+
+        prep_start = time.perf_counter()
+        prepared = cls.prepare_query(query, top) if cls._prepare_queries else None
+        breakdown.start_marks()
+        start = time.perf_counter()
+        if prepared is None:
+            search_res = await cls.search_one_async(query, top)
+        else:
+            search_res = await cls.search_prepared_async(prepared)
+        end = time.perf_counter()
+        phases = breakdown.collect_phases(start, end)
+
+        cls._record(end - start, end - start, start - prep_start)
+        return QueryResult(
+            cls._precision(query, search_res, top),
+            end - start,
+            end - start,
+            end,
+            start - prep_start,
+            phases,
+        )
+
+    @classmethod
+    def _search_batch(
+        cls, batch: List[Query], top: Optional[int] = None
+    ) -> Tuple[float, List[QueryResult]]:
+        """
+        Returns the latency of the whole batch and the result of every query
+        in it. The latency of a query is amortized: batch latency divided by
+        the number of queries in the batch.
+        """
+        batch = [cls._get_query(query) for query in batch]
+        tops = [cls._get_top(query, top) for query in batch]
+
+        start = time.perf_counter()
+        search_results = cls.search_batch(batch, max(tops))
+        end = time.perf_counter()
+
+        latency = (end - start) / len(batch)
+        results = []
+        for query, query_top, search_res in zip(batch, tops, search_results):
+            cls._record(latency, latency)
+            precision = cls._precision(query, search_res[:query_top], query_top)
+            results.append(QueryResult(precision, latency, latency, end))
+        return end - start, results
+
+    @staticmethod
+    def _observe(
+        results: Iterable[QueryResult],
+        time_series: TimeSeries,
+        phase_breakdown: breakdown.PhaseBreakdown,
+    ) -> Iterable[QueryResult]:
+        for result in results:
+            time_series.record(result.end, result.latency, result.precision)
+            phase_breakdown.record(result.phases)
+            yield result
+
+    @staticmethod
+    def _iter_batch_results(
+        results: Iterable[Tuple[float, List[QueryResult]]],
+        batch_latencies: LatencyHistogram,
+    ) -> Iterable[QueryResult]:
+        for batch_latency, batch_results in results:
+            batch_latencies.record(batch_latency)
+            yield from batch_results
+
+    @classmethod
+    def _search_all_async(
+        cls,
+        queries: Iterable[Query],
+        top: Optional[int],
+        concurrency: int,
+        duration: Optional[float] = None,
+        shuffle: bool = False,
+        seed: Optional[int] = None,
+    ) -> list:
+        """
+        Runs the queries in an event loop with `concurrency` requests in flight.
+        If `duration` is set, the queries are repeated until it expires.
+        """
+        if duration is not None:
+            queries = iter_until(iter_passes(queries, shuffle, seed), duration)
+        return asyncio.run(cls._run_async(queries, top, concurrency))
+
+    @classmethod
+    async def _run_async(
+        cls, queries: Iterable[Query], top: Optional[int], concurrency: int
+    ) -> list:
+        cls.init_async_client()
+        queries = iter(queries)
+        results = []
+
+        async def worker():
+            # All the coroutines share the same iterator, so each query is
+            # taken exactly once, by whichever request slot is free first
+            for query in queries:
+                results.append(await cls._search_one_async(query, top))
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        finally:
+            await cls.delete_async_client()
+        return results
+
+    @classmethod
+    def _search_scheduled(cls, item: Tuple[Query, float], top: Optional[int] = None):
+        query, scheduled = item
+        return cls._search_one(query, top=top, scheduled=scheduled)
+
+    def _schedule(self, queries: Iterable[Query]):
+        """
+        Open-loop mode: release queries at the target rate regardless of how
+        fast the engine answers, to avoid coordinated omission.
+        """
+        if "replay" in self.search_params:
+            # The send times come from the timestamps of the queries
+            queries, timestamped = itertools.tee(queries)
+            offsets = iter_trace_offsets(
+                (query.timestamp for query in timestamped),
+                self.search_params["replay"].get("speed", 1.0),
+            )
+            return iter_scheduled(queries, offsets, start=time.perf_counter())
+        offsets = iter_arrivals(
+            self.search_params["rps"],
+            self.search_params.get("arrival", ARRIVAL_FIXED),
+            self.search_params.get("seed"),
+        )
+        return iter_scheduled(queries, offsets, start=time.perf_counter())
+
+    @staticmethod
+    def _broadcast(pool: Optional[WorkerPool], func, *args) -> list:
+        """
+        Runs `func` once in every client process
+        """
+        if pool is None:
+            return [func(*args)]
+        return pool.broadcast(func, *args)
+
+    def _collect_histograms(
+        self, pool: Optional[WorkerPool]
+    ) -> Dict[str, LatencyHistogram]:
+        merged = {}
+        for histograms in self._broadcast(pool, self.__class__._get_histograms):
+            for name, histogram in histograms.items():
+                if name in merged:
+                    merged[name].merge(histogram)
+                else:
+                    merged[name] = histogram
+        return merged
+
+    @staticmethod
+    def _map(
+        pool: Optional[WorkerPool],
+        func,
+        items: Iterable,
+        ordered: bool = False,
+        limit: Optional[int] = None,
+    ) -> Iterable:
+        """
+        Runs `func` over the items in the pool, or in the current process if
+        there is no pool. `limit` bounds the number of items sent to the pool
+        but not processed yet, which is required for endless item streams.
+        """
+        if pool is None:
+            return map(func, items)
+        limiter = InFlightLimiter(limit) if limit is not None else None
+        if limiter is not None:
+            items = limiter.feed(items)
+        imap = pool.imap if ordered else pool.imap_unordered
+        results = imap(func, items)
+        if limiter is not None:
+            results = limiter.results(results)
+        return results
+
+    def _warmup(
+        self,
+        pool: Optional[WorkerPool],
+        queries: Iterable[Query],
+        top: Optional[int],
+        parallel: int,
+        concurrency: Optional[int],
+    ) -> Tuple[Iterable[Query], Optional[dict]]:
+        """
+        Sends the first queries of the set through the same clients before the
+        timed run, to warm up connections, caches and lazily loaded indexes.
+        The warmup queries are left out of the timed run, which would
+        otherwise hit the caches they just warmed.
+
+        The cold requests are the first request of every client process,
+        sent to all of them at once, or with `concurrency` the first request
+        of every in-flight slot.
+
+        :return: the queries for the timed run and the warmup statistics,
+            None for an empty query set
+        """
+        warmup = self.search_params["warmup"]
+        duration = warmup.get("duration")
+        queries = iter(queries)
+        buffer = list(itertools.islice(queries, warmup.get("queries", WARMUP_BUFFER)))
+        if not buffer:
+            return queries, None
+        following = next(queries, None)
+        if following is None:
+            raise ValueError(
+                f"Warmup takes all the {len(buffer)} queries of the set,"
+                " none are left for the timed run"
+            )
+        queries = itertools.chain([following], queries)
+
+        start = time.perf_counter()
+        if concurrency is not None:
+            shards = [buffer[i::parallel] for i in range(parallel)]
+            search_shard = functools.partial(
+                self.__class__._search_all_async,
+                top=top,
+                concurrency=concurrency,
+                duration=duration,
+            )
+            shard_results = list(self._map(pool, search_shard, shards, ordered=True))
+            # The first request of every in-flight slot opens a connection
+            cold = [res for shard in shard_results for res in shard[:concurrency]]
+            results = [res for shard in shard_results for res in shard]
+        else:
+            search_one = functools.partial(self.__class__._search_one, top=top)
+            # Exactly one request in every process
+            cold = self._broadcast(pool, search_one, buffer[0])
+            items = buffer[1:]
+            if duration is not None:
+                items = iter_until(iter_passes(buffer), duration)
+            results = cold + list(
+                self._map(
+                    pool,
+                    search_one,
+                    tqdm.tqdm(items, desc="Warmup"),
+                    ordered=True,
+                    limit=parallel * 2,
+                )
+            )
+        total_time = time.perf_counter() - start
+
+        latencies = [result.latency for result in results]
+        warmup_stats = {
+            "queries": len(results),
+            "total_time": total_time,
+            **latency_summary(latencies),
+        }
+        cold_stats = {
+            "queries": len(cold),
+            "first_time": cold[0].latency,
+            **latency_summary([result.latency for result in cold]),
+        }
+        return queries, {
+            "warmup": warmup_stats,
+            "cold": cold_stats,
+        }
 
     def search_all(
         self,
@@ -59,54 +608,336 @@ class BaseSearcher:
     ):
         parallel = self.search_params.get("parallel", 1)
         top = self.search_params.get("top", None)
+        target_rps = self.search_params.get("rps", None)
+        replay = self.search_params.get("replay", None)
+        concurrency = self.search_params.get("concurrency", None)
+        batch_size = self.search_params.get("batch_size", None)
+        if target_rps is not None and concurrency is not None:
+            raise ValueError("Open-loop rps mode does not support concurrency")
+        if batch_size is not None and (
+            target_rps is not None or concurrency is not None
+        ):
+            raise ValueError("Batch search does not support rps and concurrency")
+        if replay is not None and any(
+            self.search_params.get(key)
+            for key in (
+                "rps",
+                "concurrency",
+                "batch_size",
+                "duration",
+                "shared_queries",
+            )
+        ):
+            raise ValueError(
+                "Replay does not support rps, concurrency, batch_size, duration"
+                " and shared_queries"
+            )
+        scheduled = target_rps is not None or replay is not None
+        duration = self.search_params.get("duration", None)
+        shuffle = self.search_params.get("shuffle", False)
+        histogram = self.search_params.get("histogram", False)
+        prepare_queries = self.search_params.get("prepare_queries", False)
+        window = self.search_params.get("time_series_window", DEFAULT_WINDOW)
+        cpu_affinity = self.search_params.get("cpu_affinity", None)
+        executor = self.search_params.get("executor", EXECUTOR_PROCESS)
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor: <{executor}>")
+        if executor == EXECUTOR_THREAD and concurrency is not None:
+            raise ValueError("Thread executor does not support concurrency")
+        parent_cores = worker_cores = None
+        if cpu_affinity is not None:
+            parent_cores, worker_cores = plan_affinity(
+                cpu_affinity, parallel if parallel > 1 else 0
+            )
 
         # setup_search may require initialized client
+        init_start = time.perf_counter()
         self.init_client(
             self.host, distance, self.connection_params, self.search_params
         )
+        init_times = [time.perf_counter() - init_start]
+        startup_time = 0.0
+        self._reset_histograms(histogram)
+        # Shared with the workers of the `executor: thread` mode
+        self.__class__._prepare_queries = prepare_queries
         self.setup_search()
 
-        search_one = functools.partial(self.__class__._search_one, top=top)
+        shared_queries = None
+        warmup_stats = None
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(pinned(parent_cores))
+            pool = None
+            if parallel > 1 and executor == EXECUTOR_THREAD:
+                # Threads start in no time, there is nothing to reuse
+                pool = stack.enter_context(
+                    ThreadWorkerPool(
+                        parallel,
+                        initializer=self.__class__._init_thread,
+                        initargs=(
+                            self.host,
+                            distance,
+                            self.connection_params,
+                            self.search_params,
+                        ),
+                        affinity=worker_cores,
+                    )
+                )
+                init_times = pool.wait_ready()
+                startup_time = pool.startup_time
+            elif parallel > 1:
+                ctx = get_context(self.get_mp_start_method())
 
-        if parallel == 1:
-            start = time.perf_counter()
-            precisions, latencies = list(
-                zip(*[search_one(query) for query in tqdm.tqdm(queries)])
-            )
-        else:
-            ctx = get_context(self.get_mp_start_method())
+                if self.search_params.get("shared_queries", False):
+                    # Load the queries into shared memory once, so the workers
+                    # get only row indices instead of pickled Query objects
+                    shared_queries = SharedQueries.create(queries)
+                    # Also released when the search fails, the callbacks run
+                    # in reverse order
+                    stack.callback(shared_queries.unlink)
+                    stack.callback(shared_queries.close)
+                    queries = range(len(shared_queries))
 
-            with ctx.Pool(
-                processes=parallel,
-                initializer=self.__class__.init_client,
-                initargs=(
+                initargs = (
                     self.host,
                     distance,
                     self.connection_params,
                     self.search_params,
-                ),
-            ) as pool:
-                if parallel > 10:
-                    time.sleep(15)  # Wait for all processes to start
-                start = time.perf_counter()
-                precisions, latencies = list(
-                    zip(*pool.imap_unordered(search_one, iterable=tqdm.tqdm(queries)))
+                    shared_queries.descriptor() if shared_queries else None,
                 )
 
-        total_time = time.perf_counter() - start
+                def create_pool():
+                    return WorkerPool(
+                        ctx,
+                        processes=parallel,
+                        initializer=self.__class__._init_worker,
+                        initargs=initargs,
+                        affinity=worker_cores,
+                    )
+
+                if self.worker_pools is None:
+                    pool, created = stack.enter_context(create_pool()), True
+                else:
+                    # Everything fixed when the workers start
+                    pool_key = (
+                        self.__class__,
+                        parallel,
+                        self.get_mp_start_method(),
+                        repr(cpu_affinity),
+                    )
+                    pool, created = self.worker_pools.get(pool_key, create_pool)
+
+                    def discard_on_error(exc_type, exc_value, traceback):
+                        # A pool interrupted in the middle of a run can't be reused
+                        if exc_type is not None:
+                            self.worker_pools.discard(pool_key)
+
+                    stack.push(discard_on_error)
+
+                if created:
+                    # Start the clock only when all the clients are connected
+                    init_times = pool.wait_ready()
+                    startup_time = pool.startup_time
+                else:
+                    reconfigure_start = time.perf_counter()
+                    init_times = pool.broadcast(
+                        self.__class__._reconfigure_worker, *initargs
+                    )
+                    startup_time = time.perf_counter() - reconfigure_start
+
+            if "warmup" in self.search_params:
+                queries, warmup_stats = self._warmup(
+                    pool, queries, top, parallel, concurrency
+                )
+                # Warmup latencies must not leak into the measurement
+                self._broadcast(pool, self.__class__._reset_histograms, histogram)
+
+            num_queries = None
+            if duration is not None:
+                # The query set is repeated, so it has to be kept in memory
+                queries = list(queries)
+                num_queries = len(queries)
+
+            limit = None
+            if concurrency is not None:
+                # Every process gets its own share of queries and keeps
+                # `concurrency` of them in flight
+                if pool is None:
+                    items = [queries]
+                else:
+                    queries = list(queries)
+                    items = [queries[i::parallel] for i in range(parallel)]
+                search_one = functools.partial(
+                    self.__class__._search_all_async,
+                    top=top,
+                    concurrency=concurrency,
+                    duration=duration,
+                    shuffle=shuffle,
+                    seed=self.search_params.get("seed"),
+                )
+            else:
+                items = queries
+                if duration is not None:
+                    items = iter_until(
+                        iter_passes(queries, shuffle, self.search_params.get("seed")),
+                        duration,
+                    )
+                    if not scheduled:
+                        limit = parallel * 2
+                if batch_size is not None:
+                    items = iter_batches(items, batch_size)
+                    search_one = functools.partial(
+                        self.__class__._search_batch, top=top
+                    )
+                elif scheduled:
+                    search_one = functools.partial(
+                        self.__class__._search_scheduled, top=top
+                    )
+                else:
+                    search_one = functools.partial(self.__class__._search_one, top=top)
+
+            cpu_monitor = CpuMonitor(os.getpid(), pool.pids if pool else [])
+            cpu_monitor.start()
+            start = time.perf_counter()
+            time_series = TimeSeries(window, start)
+            if scheduled:
+                items = self._schedule(items)
+            results = self._map(pool, search_one, tqdm.tqdm(items), limit=limit)
+            if concurrency is not None:
+                results = itertools.chain.from_iterable(results)
+            if batch_size is not None:
+                batch_latencies = LatencyHistogram()
+                results = self._iter_batch_results(results, batch_latencies)
+            phase_breakdown = breakdown.PhaseBreakdown()
+            results = self._observe(results, time_series, phase_breakdown)
+            if histogram:
+                # Latencies are recorded by the workers, keep only the counters
+                num_completed, precision_sum = 0, 0.0
+                for result in results:
+                    num_completed += 1
+                    precision_sum += result.precision
+                end = time.perf_counter()
+                total_time = end - start
+                histograms = self._collect_histograms(pool)
+                precisions = latencies = None
+                mean_precision = (
+                    precision_sum / num_completed if num_completed > 0 else None
+                )
+                latency = histograms["latency"].stats()
+                service = histograms["service"].stats()
+                prep = histograms["prep"].stats()
+            else:
+                results = list(results)
+                end = time.perf_counter()
+                total_time = end - start
+                precisions = [result.precision for result in results]
+                latencies = [result.latency for result in results]
+                service_times = [result.service_time for result in results]
+                prep_times = [result.prep_time for result in results]
+                num_completed = len(latencies)
+                mean_precision = np.mean(precisions) if precisions else None
+                latency = latency_stats(latencies)
+                service = latency_stats(service_times)
+                prep = latency_stats(prep_times)
+            client_cpu = cpu_monitor.stop()
 
         self.__class__.delete_client()
 
+        if client_cpu.get("saturated"):
+            print(
+                "WARNING: the benchmark client is CPU saturated ("
+                + ", ".join(client_cpu["saturation_reasons"])
+                + "), the results may be limited by the client, not the engine"
+            )
+
+        open_loop_stats = {}
+        if target_rps is not None:
+            open_loop_stats = {
+                "target_rps": target_rps,
+                "arrival": self.search_params.get("arrival", ARRIVAL_FIXED),
+                "mean_service_time": service["mean_time"],
+                "p95_service_time": service["p95_time"],
+                "p99_service_time": service["p99_time"],
+            }
+        elif replay is not None:
+            open_loop_stats = {
+                "replay_speed": replay.get("speed", 1.0),
+                "mean_service_time": service["mean_time"],
+                "p95_service_time": service["p95_time"],
+                "p99_service_time": service["p99_time"],
+            }
+
+        duration_stats = {}
+        if duration is not None:
+            duration_stats = {
+                "duration": duration,
+                # None for an empty query set, like the latency stats
+                "query_passes": num_completed / num_queries if num_queries else None,
+            }
+
+        warmup_results = {}
+        if warmup_stats is not None:
+            warmup_results = {
+                "warmup": warmup_stats["warmup"],
+                "cold_vs_warm": {
+                    "cold": warmup_stats["cold"],
+                    "warm": {key: latency[key] for key in SUMMARY_KEYS},
+                },
+            }
+
+        batch_stats = {}
+        if batch_size is not None:
+            batch_latency = batch_latencies.stats()
+            batch_stats = {
+                "batch_size": batch_size,
+                "batches": batch_latencies.total,
+                "mean_batch_time": batch_latency["mean_time"],
+                "p95_batch_time": batch_latency["p95_time"],
+                "p99_batch_time": batch_latency["p99_time"],
+                "max_batch_time": batch_latency["max_time"],
+            }
+
+        breakdown_results = {}
+        if phase_breakdown.histograms:
+            breakdown_results = {"latency_breakdown": phase_breakdown.stats()}
+
+        affinity_results = {}
+        if cpu_affinity is not None:
+            affinity_results = {"cpu_affinity": describe(parent_cores, worker_cores)}
+
+        histogram_results = {}
+        if histogram:
+            histogram_results = {
+                "latency_histogram": histograms["latency"].encode(),
+            }
+
         return {
             "total_time": total_time,
-            "mean_time": np.mean(latencies),
-            "mean_precisions": np.mean(precisions),
-            "std_time": np.std(latencies),
-            "min_time": np.min(latencies),
-            "max_time": np.max(latencies),
-            "rps": len(latencies) / total_time,
-            "p95_time": np.percentile(latencies, 95),
-            "p99_time": np.percentile(latencies, 99),
+            "mean_time": latency["mean_time"],
+            "mean_precisions": mean_precision,
+            "std_time": latency["std_time"],
+            "min_time": latency["min_time"],
+            "max_time": latency["max_time"],
+            "rps": num_completed / total_time,
+            "p95_time": latency["p95_time"],
+            "p99_time": latency["p99_time"],
+            "p99_9_time": latency["p99_9_time"],
+            "p99_99_time": latency["p99_99_time"],
+            "mean_prep_time": prep["mean_time"],
+            "p99_prep_time": prep["p99_time"],
+            "prepare_queries": prepare_queries,
+            **open_loop_stats,
+            **duration_stats,
+            **warmup_results,
+            **batch_stats,
+            **breakdown_results,
+            "startup_time": startup_time,
+            "mean_worker_init_time": np.mean(init_times),
+            "max_worker_init_time": np.max(init_times),
+            "worker_init_times": init_times,
+            "client_cpu": client_cpu,
+            **affinity_results,
+            **histogram_results,
+            "time_series": time_series.to_list(end),
             "precisions": precisions,
             "latencies": latencies,
         }
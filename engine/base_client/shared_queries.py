@@ -0,0 +1,123 @@
+from multiprocessing import shared_memory
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from dataset_reader.base_reader import Query
+
+
+class SharedQueries:
+    """
+    Dense query vectors and ground truth, stored once in shared memory.
+
+    Pool workers attach to the same memory and receive only row indices, so the
+    parent process does not have to pickle a Query object for every request.
+    Filters are small and rare, so they are shipped to every worker once, when
+    the worker attaches.
+    """
+
+    def __init__(
+        self,
+        vectors: shared_memory.SharedMemory,
+        expected: shared_memory.SharedMemory,
+        shape: tuple,
+        expected_shape: tuple,
+        expected_lengths: List[int],
+        meta_conditions: Optional[List[Optional[dict]]],
+    ):
+        self._vectors_shm = vectors
+        self._expected_shm = expected
+        self.vectors = np.ndarray(shape, dtype=np.float32, buffer=vectors.buf)
+        self.expected = np.ndarray(expected_shape, dtype=np.int64, buffer=expected.buf)
+        self.expected_lengths = expected_lengths
+        self.meta_conditions = meta_conditions
+
+    @classmethod
+    def create(cls, queries: Iterable[Query]) -> "SharedQueries":
+        vectors, expected, meta_conditions = [], [], []
+        for query in queries:
+            if query.vector is None:
+                raise ValueError("Shared queries support dense vectors only")
+            vectors.append(np.asarray(query.vector, dtype=np.float32))
+            expected.append(query.expected_result or [])
+            meta_conditions.append(query.meta_conditions)
+
+        if len(vectors) == 0:
+            raise ValueError("No queries to share")
+
+        shape = (len(vectors), len(vectors[0]))
+        expected_lengths = [len(result) for result in expected]
+        expected_shape = (len(expected), max(max(expected_lengths), 1))
+
+        # SharedMemory does not accept zero size
+        vectors_shm = shared_memory.SharedMemory(
+            create=True, size=max(int(np.prod(shape)) * 4, 1)
+        )
+        expected_shm = shared_memory.SharedMemory(
+            create=True, size=int(np.prod(expected_shape)) * 8
+        )
+        shared = cls(
+            vectors_shm,
+            expected_shm,
+            shape,
+            expected_shape,
+            expected_lengths,
+            meta_conditions if any(meta_conditions) else None,
+        )
+        shared.vectors[:] = np.stack(vectors)
+        shared.expected[:] = -1
+        for i, result in enumerate(expected):
+            shared.expected[i, : len(result)] = result
+        return shared
+
+    def descriptor(self) -> dict:
+        """
+        Picklable description, passed to the pool workers to attach
+        """
+        return {
+            "vectors": self._vectors_shm.name,
+            "expected": self._expected_shm.name,
+            "shape": self.vectors.shape,
+            "expected_shape": self.expected.shape,
+            "expected_lengths": self.expected_lengths,
+            "meta_conditions": self.meta_conditions,
+        }
+
+    @classmethod
+    def attach(cls, descriptor: dict) -> "SharedQueries":
+        return cls(
+            shared_memory.SharedMemory(name=descriptor["vectors"]),
+            shared_memory.SharedMemory(name=descriptor["expected"]),
+            descriptor["shape"],
+            descriptor["expected_shape"],
+            descriptor["expected_lengths"],
+            descriptor["meta_conditions"],
+        )
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    def __getitem__(self, index: int) -> Query:
+        expected_length = self.expected_lengths[index]
+        return Query(
+            vector=self.vectors[index].tolist(),
+            sparse_vector=None,
+            meta_conditions=(
+                self.meta_conditions[index] if self.meta_conditions else None
+            ),
+            expected_result=(
+                self.expected[index, :expected_length].tolist()
+                if expected_length > 0
+                else None
+            ),
+        )
+
+    def close(self):
+        # Views have to be released before the memory can be closed
+        del self.vectors, self.expected
+        self._vectors_shm.close()
+        self._expected_shm.close()
+
+    def unlink(self):
+        self._vectors_shm.unlink()
+        self._expected_shm.unlink()
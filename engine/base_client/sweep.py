@@ -0,0 +1,100 @@
+from typing import Callable, Iterable, Tuple
+
+from dataset_reader.base_reader import Query
+from engine.base_client.search import BaseSearcher
+
+SWEEP_KEYS = ("parallel", "rps")
+CURVE_FIELDS = (
+    "rps",
+    "mean_time",
+    "p95_time",
+    "p99_time",
+    "max_time",
+    "mean_precisions",
+)
+
+
+def _passed(
+    stats: dict, p99_sla: float, baseline_precision: float, max_precision_drop: float
+) -> bool:
+    if stats["p99_time"] is None:
+        # No query completed, the stats are all None
+        return False
+    return bool(
+        stats["p99_time"] <= p99_sla
+        and stats["mean_precisions"] >= baseline_precision - max_precision_drop
+    )
+
+
+def sweep_search(
+    searcher: BaseSearcher,
+    distance,
+    read_queries: Callable[[], Iterable[Query]],
+) -> Tuple[dict, dict, dict]:
+    """
+    Ramps the load of a search config step by step and stops at the first step
+    which violates the p99 latency SLA or loses precision.
+
+    The sweep is described by the "sweep" key of the search params, e.g.:
+    {
+        "parallel": [1, 2, 4, 8, 16, 32, 64, 100],  # or "rps": [...]
+        "p99_sla": 0.05,  # seconds
+        "max_precision_drop": 0.01  # allowed drop compared to the first step
+    }
+
+    :return: search stats and params of the knee step (the last step within
+        the SLA, or the first step if none of them passed) and a summary of
+        the whole sweep
+    """
+    sweep = searcher.search_params["sweep"]
+    keys = [key for key in SWEEP_KEYS if key in sweep]
+    if len(keys) != 1:
+        raise ValueError(f"Sweep must ramp exactly one of {SWEEP_KEYS}, got {keys}")
+    key = keys[0]
+    if not sweep[key]:
+        raise ValueError(f"Sweep over {key} has no steps")
+    p99_sla = sweep["p99_sla"]
+    max_precision_drop = sweep.get("max_precision_drop", 0.0)
+
+    curve = []
+    knee = None
+    baseline_precision = None
+    for value in sweep[key]:
+        search_params = {**searcher.search_params, key: value}
+        step_searcher = searcher.__class__(
+            searcher.host, searcher.connection_params, search_params
+        )
+        step_searcher.worker_pools = searcher.worker_pools
+        print(f"Sweep step: {key}={value}")
+        stats = step_searcher.search_all(distance, read_queries())
+
+        if baseline_precision is None:
+            baseline_precision = stats["mean_precisions"]
+        passed = _passed(stats, p99_sla, baseline_precision, max_precision_drop)
+        curve.append(
+            {
+                "step": value,
+                **{field: stats[field] for field in CURVE_FIELDS},
+                "passed": passed,
+            }
+        )
+        if not passed:
+            print(f"Sweep stopped at {key}={value}: p99={stats['p99_time']}")
+            break
+        knee = (stats, search_params, curve[-1])
+
+    if knee is None:
+        # Even the lowest load is out of the SLA, keep its result anyway
+        knee_stats, knee_params, knee_point = stats, search_params, None
+    else:
+        knee_stats, knee_params, knee_point = knee
+
+    summary = {
+        "sweep_key": key,
+        "p99_sla": p99_sla,
+        "max_precision_drop": max_precision_drop,
+        "knee": knee_point,
+        "knee_rps": knee_point["rps"] if knee_point else None,
+        "curve": curve,
+    }
+    return knee_stats, knee_params, summary
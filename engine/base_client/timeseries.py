@@ -0,0 +1,78 @@
+import time
+from typing import Dict, List, Optional
+
+from engine.base_client.histogram import LatencyHistogram
+
+DEFAULT_WINDOW = 1.0
+WINDOW_KEYS = ("mean_time", "p50_time", "p95_time", "p99_time", "max_time")
+
+
+class TimeSeries:
+    """
+    Completed requests, their latencies and, for searches, the precision per
+    fixed window of a run.
+
+    Whole-run aggregates hide the stalls caused by compactions, GC pauses or
+    segment merges in the middle of a run. Every window keeps its own
+    histogram, so the memory does not depend on the number of requests, and
+    carries a wall clock timestamp to match it with the server logs.
+    """
+
+    def __init__(self, window: float = DEFAULT_WINDOW, start: Optional[float] = None):
+        if window <= 0:
+            raise ValueError(f"Time series window must be positive, got {window}")
+        self.window = window
+        self.start = time.perf_counter() if start is None else start
+        # `perf_counter` has no defined epoch, keep the matching wall clock time
+        self.wall_start = time.time() - (time.perf_counter() - self.start)
+        self._windows: Dict[int, LatencyHistogram] = {}
+        # Window index -> sum of the precisions recorded in it
+        self._precisions: Dict[int, float] = {}
+
+    def record(self, end: float, latency: float, precision: Optional[float] = None):
+        """
+        :param end: `perf_counter` time the request completed at
+        :param latency: latency of the request in seconds
+        :param precision: precision of the search results, if any
+        """
+        index = max(int((end - self.start) // self.window), 0)
+        if index not in self._windows:
+            self._windows[index] = LatencyHistogram()
+        self._windows[index].record(latency)
+        if precision is not None:
+            self._precisions[index] = self._precisions.get(index, 0.0) + precision
+
+    def to_list(self, end: Optional[float] = None) -> List[dict]:
+        """
+        :param end: `perf_counter` time the run finished at, to include the
+            trailing empty windows and the real length of the last one
+        :return: one entry per window, empty windows included
+        """
+        num_windows = max(self._windows, default=-1) + 1
+        if end is not None:
+            num_windows = max(num_windows, int((end - self.start) // self.window) + 1)
+
+        series = []
+        for index in range(num_windows):
+            offset = index * self.window
+            length = self.window
+            if end is not None:
+                length = min(length, end - self.start - offset)
+            histogram = self._windows.get(index)
+            count = histogram.total if histogram is not None else 0
+            entry = {
+                "time": offset,
+                "timestamp": self.wall_start + offset,
+                "count": count,
+                "rps": count / length if length > 0 else 0.0,
+            }
+            stats = histogram.stats() if histogram is not None else {}
+            entry.update({key: stats.get(key) for key in WINDOW_KEYS})
+            if self._precisions:
+                entry["mean_precision"] = (
+                    self._precisions[index] / count
+                    if index in self._precisions
+                    else None
+                )
+            series.append(entry)
+        return series
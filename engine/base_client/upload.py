@@ -1,15 +1,38 @@
+import contextlib
+import functools
+import heapq
 import time
 from multiprocessing import get_context
-from typing import Iterable, List
+from typing import Any, Callable, Iterable, List, Optional, Tuple
 
 import tqdm
 
 from dataset_reader.base_reader import Record
-from engine.base_client.utils import iter_batches
+from engine.base_client.affinity import describe, pinned, plan_affinity
+from engine.base_client.batching import AdaptiveBatcher
+from engine.base_client.checkpoint import UploadCheckpoint
+from engine.base_client.pipeline import DEFAULT_QUEUE_SIZE, UploadPipeline
+from engine.base_client.readiness import IndexStatus, ReadinessPoller
+from engine.base_client.schedule import InFlightLimiter
+from engine.base_client.timeseries import DEFAULT_WINDOW, TimeSeries
+from engine.base_client.utils import BatchUploadError, describe_batch, iter_batches
+from engine.base_client.worker_pool import (
+    EXECUTOR_PROCESS,
+    EXECUTOR_THREAD,
+    EXECUTORS,
+    ThreadWorkerPool,
+    WorkerPool,
+)
+
+# Number of the slowest batches listed in the upload results
+SLOWEST_BATCHES = 5
 
 
 class BaseUploader:
     client = None
+    upload_params = {}
+    # Whether `upload_batch` overwrites the records with existing ids
+    upserts = False
 
     def __init__(self, host, connection_params, upload_params):
         self.host = host
@@ -24,70 +47,265 @@ class BaseUploader:
     def init_client(cls, host, distance, connection_params: dict, upload_params: dict):
         raise NotImplementedError()
 
+    @classmethod
+    def init_thread(cls, host, distance, connection_params: dict, upload_params: dict):
+        """
+        Called in every thread of the `executor: thread` mode, after the main
+        thread ran `init_client`. The threads share the client by default,
+        clients which are not thread-safe create a per-thread one here.
+        """
+        pass
+
     def upload(
         self,
         distance,
         records: Iterable[Record],
+        checkpoint: Optional[UploadCheckpoint] = None,
     ) -> dict:
-        latencies = []
+        """
+        :param checkpoint: tracks the acknowledged records, the ones uploaded
+            before a resume are skipped and the other ones are written with
+            `replace_batch`, as some of them may be in the collection already
+        """
+        results = []
         start = time.perf_counter()
         parallel = self.upload_params.get("parallel", 1)
         batch_size = self.upload_params.get("batch_size", 64)
+        window = self.upload_params.get("time_series_window", DEFAULT_WINDOW)
 
-        if parallel == 1:
-            # Initialize client in parent process for serial uploads
-            self.init_client(
-                self.host, distance, self.connection_params, self.upload_params
+        cpu_affinity = self.upload_params.get("cpu_affinity", None)
+        parent_cores = worker_cores = None
+        if cpu_affinity is not None:
+            parent_cores, worker_cores = plan_affinity(
+                cpu_affinity, int(parallel) if parallel > 1 else 0
             )
-            for batch in iter_batches(tqdm.tqdm(records), batch_size):
-                latencies.append(self._upload_batch(batch))
-        else:
-            ctx = get_context(self.get_mp_start_method())
-            with ctx.Pool(
-                processes=int(parallel),
-                initializer=self.__class__.init_client,
-                initargs=(
-                    self.host,
-                    distance,
-                    self.connection_params,
-                    self.upload_params,
-                ),
-            ) as pool:
-                latencies = list(
-                    pool.imap(
-                        self.__class__._upload_batch,
-                        iter_batches(tqdm.tqdm(records), batch_size),
+
+        executor = self.upload_params.get("executor", EXECUTOR_PROCESS)
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor: <{executor}>")
+        pipeline = self.upload_params.get("pipeline", None)
+        if pipeline is not None and executor != EXECUTOR_PROCESS:
+            raise ValueError("Upload pipeline requires the process executor")
+        pipeline_results = {}
+        in_flight = self.upload_params.get("in_flight", None)
+
+        # Called with the number and latency of every uploaded batch
+        observers = []
+        adaptive_batch = self.upload_params.get("adaptive_batch", None)
+        batcher = None
+        if adaptive_batch is not None:
+            batcher = AdaptiveBatcher.from_params(batch_size, adaptive_batch)
+            observers.append(batcher.observe)
+            if in_flight is None and parallel > 1:
+                # The batches read ahead of the workers are cut with a stale
+                # size, the pool would read them all upfront otherwise
+                in_flight = 2 * int(parallel)
+
+        replace = checkpoint is not None and checkpoint.resumed
+        if checkpoint is not None:
+            checkpoint.connection_params = self.connection_params
+            records = checkpoint.skip(records)
+            observers.append(checkpoint.ack)
+
+        observe = None
+        if observers:
+
+            def observe(batch_id: int, latency: float):
+                for observer in observers:
+                    observer(batch_id, latency)
+
+        def batches() -> Iterable[List[Record]]:
+            if batcher is not None:
+                batches = batcher.batches(tqdm.tqdm(records))
+            else:
+                batches = iter_batches(tqdm.tqdm(records), batch_size)
+            if checkpoint is not None:
+                batches = checkpoint.track(batches)
+            return batches
+
+        with pinned(parent_cores), checkpoint or contextlib.nullcontext():
+            if pipeline is not None:
+                results, pipeline_stats = UploadPipeline(
+                    get_context(self.get_mp_start_method()),
+                    self.__class__,
+                    (self.host, distance, self.connection_params, self.upload_params),
+                    workers=int(parallel),
+                    queue_size=pipeline.get("queue_size", DEFAULT_QUEUE_SIZE),
+                    affinity=worker_cores,
+                    replace=replace,
+                ).run(batches(), observe)
+                pipeline_results = {"pipeline": pipeline_stats}
+                # Initialize client in parent process for post-upload operations
+                self.init_client(
+                    self.host, distance, self.connection_params, self.upload_params
+                )
+            elif parallel == 1:
+                # Initialize client in parent process for serial uploads
+                self.init_client(
+                    self.host, distance, self.connection_params, self.upload_params
+                )
+                for item in enumerate(batches()):
+                    results.append(self._upload_numbered(item, replace))
+                    if observe is not None:
+                        observe(item[0], results[-1][0])
+            elif executor == EXECUTOR_THREAD:
+                # The threads share the client of the parent, which is also
+                # used for post-upload operations
+                self.init_client(
+                    self.host, distance, self.connection_params, self.upload_params
+                )
+                with ThreadWorkerPool(
+                    int(parallel),
+                    initializer=self.__class__.init_thread,
+                    initargs=(
+                        self.host,
+                        distance,
+                        self.connection_params,
+                        self.upload_params,
+                    ),
+                    affinity=worker_cores,
+                ) as pool:
+                    pool.wait_ready()
+                    results = self._map_batches(
+                        pool, batches(), in_flight, observe, replace
+                    )
+            else:
+                ctx = get_context(self.get_mp_start_method())
+                with WorkerPool(
+                    ctx,
+                    processes=int(parallel),
+                    initializer=self.__class__.init_client,
+                    initargs=(
+                        self.host,
+                        distance,
+                        self.connection_params,
+                        self.upload_params,
+                    ),
+                    affinity=worker_cores,
+                ) as pool:
+                    pool.wait_ready()
+                    results = self._map_batches(
+                        pool, batches(), in_flight, observe, replace
                     )
+                # Initialize client in parent process for post-upload operations
+                self.init_client(
+                    self.host, distance, self.connection_params, self.upload_params
                 )
-            # Initialize client in parent process for post-upload operations
-            self.init_client(
-                self.host, distance, self.connection_params, self.upload_params
-            )
 
-        upload_time = time.perf_counter() - start
+        upload_end = time.perf_counter()
+        upload_time = upload_end - start
+
+        latencies = [latency for latency, _, _ in results]
+        time_series = TimeSeries(window, start)
+        for latency, end, _ in results:
+            time_series.record(end, latency)
+        slowest_batches = [
+            {"batch_id": batch_id, "latency": latency}
+            for latency, _, batch_id in heapq.nlargest(SLOWEST_BATCHES, results)
+        ]
 
         print("Upload time: {}".format(upload_time))
 
         post_upload_stats = self.post_upload(distance)
 
-        total_time = time.perf_counter() - start
+        # The polls confirming the index got ready are not import time
+        confirmation_time = post_upload_stats.get("index", {}).get(
+            "confirmation_time", 0.0
+        )
+        total_time = time.perf_counter() - start - confirmation_time
 
         print(f"Total import time: {total_time}")
 
         self.delete_client()
 
+        checkpoint_results = {}
+        if checkpoint is not None:
+            checkpoint_results = {"checkpoint": checkpoint.stats()}
+            # Nothing left to resume
+            checkpoint.remove()
+
+        affinity_results = {}
+        if cpu_affinity is not None:
+            affinity_results = {"cpu_affinity": describe(parent_cores, worker_cores)}
+
         return {
             "post_upload": post_upload_stats,
             "upload_time": upload_time,
             "total_time": total_time,
             "latencies": latencies,
+            "time_series": time_series.to_list(upload_end),
+            "slowest_batches": slowest_batches,
+            **({"in_flight": in_flight} if in_flight is not None else {}),
+            **({"adaptive_batch": batcher.stats()} if batcher is not None else {}),
+            **pipeline_results,
+            **checkpoint_results,
+            **affinity_results,
         }
 
     @classmethod
-    def _upload_batch(cls, batch: List[Record]) -> float:
+    def _upload_batch(
+        cls, batch: List[Record], replace: bool = False
+    ) -> Tuple[float, float]:
+        """
+        :param replace: write with `replace_batch`
+        :return: latency of the batch and the `perf_counter` time it completed at
+        """
         start = time.perf_counter()
-        cls.upload_batch(batch)
-        return time.perf_counter() - start
+        if replace:
+            cls.replace_batch(batch)
+        else:
+            cls.upload_batch(batch)
+        end = time.perf_counter()
+        return end - start, end
+
+    @classmethod
+    def _upload_numbered(
+        cls, item: Tuple[int, List[Record]], replace: bool = False
+    ) -> Tuple[float, float, int]:
+        """
+        :return: latency of the batch, the `perf_counter` time it completed at
+            and its number
+        """
+        batch_id, batch = item
+        try:
+            latency, end = cls._upload_batch(batch, replace)
+        except Exception as e:
+            # Only the message survives the way back from a worker process
+            raise BatchUploadError(
+                f"Upload of {describe_batch(batch_id, batch)} failed: {e!r}"
+            ) from e
+        return latency, end, batch_id
+
+    def _map_batches(
+        self,
+        pool,
+        batches: Iterable[List[Record]],
+        in_flight: Optional[int],
+        observe: Optional[Callable[[int, float], None]] = None,
+        replace: bool = False,
+    ) -> List[Tuple[float, float, int]]:
+        upload = functools.partial(self.__class__._upload_numbered, replace=replace)
+        if in_flight is None:
+            results = pool.imap(upload, enumerate(batches))
+        else:
+            # Results in completion order: a slow batch doesn't hold back the
+            # results of the other workers, and no more than `in_flight`
+            # batches are read and pickled ahead
+            limiter = InFlightLimiter(in_flight)
+            results = limiter.results(
+                pool.imap_unordered(
+                    upload,
+                    limiter.feed(enumerate(batches)),
+                )
+            )
+        if observe is None:
+            return list(results)
+        collected = []
+        for latency, end, batch_id in results:
+            # The batches still to be cut adapt to the latency
+            observe(batch_id, latency)
+            collected.append((latency, end, batch_id))
+        return collected
 
     @classmethod
     def post_upload(cls, distance):
@@ -97,6 +315,88 @@ class BaseUploader:
     def upload_batch(cls, batch: List[Record]):
         raise NotImplementedError()
 
+    @classmethod
+    def replace_batch(cls, batch: List[Record]):
+        """
+        Uploads records which may already be in the collection. Unless the
+        engine `upserts`, they are deleted first, as an insert of an existing
+        id fails on most engines, and silently adds a duplicate on others
+        (e.g. Milvus).
+        """
+        if not cls.upserts:
+            cls.delete_batch([record.id for record in batch])
+        cls.upload_batch(batch)
+
+    @classmethod
+    def encode_batch(cls, batch: List[Record]) -> Any:
+        """
+        Encode stage of the upload pipeline: turns the batch into the payload
+        sent by `upload_encoded`, e.g. the request body. Timed apart from the
+        send, to tell the client CPU from the engine time.
+        """
+        return batch
+
+    @classmethod
+    def upload_encoded(cls, payload: Any):
+        """
+        Sends a payload made by `encode_batch`
+        """
+        cls.upload_batch(payload)
+
+    @classmethod
+    def delete_batch(cls, ids: List[int]):
+        """
+        Deletes the records with the given ids, used by the churn workload and
+        by `replace_batch`
+        """
+        raise NotImplementedError()
+
+    @classmethod
+    def index_ready(cls) -> bool:
+        """
+        Whether the engine finished indexing all the acknowledged writes and
+        deletes. Engines which index synchronously are always ready.
+        """
+        return True
+
+    @classmethod
+    def index_status(cls) -> IndexStatus:
+        """
+        Readiness of the index with the indexing progress, for the engines
+        which report it
+        """
+        return IndexStatus(cls.index_ready())
+
+    @classmethod
+    def wait_index(
+        cls,
+        status: Optional[Callable[[], IndexStatus]] = None,
+        poller: Optional[ReadinessPoller] = None,
+        **defaults,
+    ) -> dict:
+        """
+        Polls `status`, `index_status` by default, until the index is ready.
+        The poller is configured by the "index_poll" upload param, on top of
+        the engine `defaults` (`ReadinessPoller` arguments), e.g. a single
+        confirmation for a status which can't turn back, like a completed
+        task.
+
+        :return: stats of `ReadinessPoller.poll`
+        """
+        if poller is None:
+            poller = ReadinessPoller.from_params(
+                {**defaults, **cls.upload_params.get("index_poll", {})}
+            )
+        return poller.poll(status or cls.index_status)
+
+    @classmethod
+    def wait_index_ready(cls, poller: Optional[ReadinessPoller] = None) -> float:
+        """
+        :return: time from the call to the first ready observation of the
+            confirmed streak
+        """
+        return cls.wait_index(poller=poller)["time_to_ready"]
+
     @classmethod
     def delete_client(cls):
         pass
@@ -3,6 +3,19 @@ from typing import Iterable, List
 from dataset_reader.base_reader import Record
 
 
+class BatchUploadError(Exception):
+    """
+    Upload of a batch failed, the message tells which batch and records
+    """
+
+
+def describe_batch(batch_id: int, batch: List[Record]) -> str:
+    return (
+        f"batch {batch_id} of {len(batch)} records"
+        f" (ids {batch[0].id}..{batch[-1].id})"
+    )
+
+
 def iter_batches(records: Iterable[Record], n: int) -> Iterable[List[Record]]:
     batch = []
 
@@ -0,0 +1,262 @@
+import os
+import queue
+import threading
+import time
+from multiprocessing import resource_tracker
+from multiprocessing.pool import ThreadPool
+from types import SimpleNamespace
+from typing import Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+WORKER_STARTUP_TIMEOUT = float(os.getenv("WORKER_STARTUP_TIMEOUT", 300))
+
+EXECUTOR_PROCESS = "process"
+EXECUTOR_THREAD = "thread"
+EXECUTORS = (EXECUTOR_PROCESS, EXECUTOR_THREAD)
+
+# Set in every worker process, see `WorkerPool.broadcast`
+_broadcast_barrier = None
+
+
+def _init_worker(
+    ready,
+    broadcast_barrier,
+    reports,
+    affinity: Optional[List[Set[int]]],
+    counter,
+    initializer: Callable,
+    initargs: tuple,
+):
+    global _broadcast_barrier
+    _broadcast_barrier = broadcast_barrier
+
+    if affinity is not None:
+        # A counter rather than a queue, so a re-spawned worker gets cores too
+        with counter.get_lock():
+            index = counter.value
+            counter.value += 1
+        os.sched_setaffinity(0, affinity[index % len(affinity)])
+
+    start = time.perf_counter()
+    initializer(*initargs)
+    reports.put((os.getpid(), time.perf_counter() - start))
+    try:
+        ready.wait(timeout=WORKER_STARTUP_TIMEOUT)
+    except threading.BrokenBarrierError:
+        # A worker re-spawned after the start has nobody to wait for
+        pass
+
+
+def _run_on_worker(task: Tuple[Callable, tuple]):
+    func, args = task
+    try:
+        return func(*args)
+    finally:
+        # Keep the worker busy until every other worker got its own task,
+        # also when the function failed, so the others are not held up
+        _broadcast_barrier.wait(timeout=WORKER_STARTUP_TIMEOUT)
+
+
+class WorkerPool:
+    """
+    Process pool which starts the clock only when all the workers are ready.
+
+    Every worker runs the initializer (usually `init_client`), reports how long
+    it took, and waits on a barrier together with the parent process. So once
+    `wait_ready` returns, all the clients are connected and no request is sent
+    by a worker which is still importing or connecting.
+    """
+
+    def __init__(
+        self,
+        ctx,
+        processes: int,
+        initializer: Callable,
+        initargs: tuple,
+        startup_timeout: Optional[float] = None,
+        affinity: Optional[List[Set[int]]] = None,
+    ):
+        """
+        :param affinity: cores to pin every worker to, see `plan_affinity`
+        """
+        if ctx is not _THREAD_CONTEXT:
+            # Workers attaching shared memory later (e.g. a reused pool) must
+            # use the tracker of the parent, otherwise every worker starts its
+            # own one and reports the memory unlinked by the parent as leaked
+            resource_tracker.ensure_running()
+
+        self.processes = processes
+        self.startup_timeout = startup_timeout or WORKER_STARTUP_TIMEOUT
+        self._ready = ctx.Barrier(processes + 1)
+        self._broadcast = ctx.Barrier(processes)
+        self._reports = ctx.SimpleQueue()
+        self._created = time.perf_counter()
+        self.pool = ctx.Pool(
+            processes=processes,
+            initializer=_init_worker,
+            initargs=(
+                self._ready,
+                self._broadcast,
+                self._reports,
+                affinity,
+                ctx.Value("i", 0),
+                initializer,
+                initargs,
+            ),
+        )
+        self.startup_time = None
+        self.init_times: List[float] = []
+        self.pids: List[int] = []
+        # Set by a failed broadcast, the workers may be left in any state
+        self.broken = False
+
+    def wait_ready(self) -> List[float]:
+        """
+        Blocks until every worker has initialized its client.
+        :return: init time of every worker
+        """
+        try:
+            self._ready.wait(timeout=self.startup_timeout)
+        except threading.BrokenBarrierError:
+            raise RuntimeError(
+                f"Workers failed to start within {self.startup_timeout} seconds"
+            )
+        self.startup_time = time.perf_counter() - self._created
+        reports = [self._reports.get() for _ in range(self.processes)]
+        self.pids = [pid for pid, _ in reports]
+        self.init_times = [init_time for _, init_time in reports]
+        return self.init_times
+
+    def broadcast(self, func: Callable, *args) -> list:
+        """
+        Runs the function exactly once in every worker, e.g. to collect or
+        reset a per-process state. Must not overlap with other pool tasks.
+        :return: results of all the workers
+        """
+        try:
+            return self.pool.map(
+                _run_on_worker, [(func, args)] * self.processes, chunksize=1
+            )
+        except BaseException:
+            self.broken = True
+            raise
+
+    def imap_unordered(self, func, iterable, chunksize=1):
+        return self.pool.imap_unordered(func, iterable, chunksize)
+
+    def imap(self, func, iterable, chunksize=1):
+        return self.pool.imap(func, iterable, chunksize)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.pool.terminate()
+
+
+class _ThreadCounter:
+    def __init__(self, value: int = 0):
+        self.value = value
+        self._lock = threading.Lock()
+
+    def get_lock(self) -> threading.Lock:
+        return self._lock
+
+
+# The subset of a multiprocessing context used by `WorkerPool`
+_THREAD_CONTEXT = SimpleNamespace(
+    Pool=ThreadPool,
+    Barrier=threading.Barrier,
+    SimpleQueue=queue.SimpleQueue,
+    Value=lambda typecode, value: _ThreadCounter(value),
+)
+
+
+class ThreadWorkerPool(WorkerPool):
+    """
+    `WorkerPool` of threads in the current process.
+
+    All the threads share the class level state of the client, so a single
+    client (and its connection pool) serves all of them, unless the
+    initializer creates a per-thread one. `sched_setaffinity` applies to the
+    calling thread only, so the threads can be pinned to cores as well.
+    """
+
+    def __init__(
+        self,
+        threads: int,
+        initializer: Callable,
+        initargs: tuple,
+        startup_timeout: Optional[float] = None,
+        affinity: Optional[List[Set[int]]] = None,
+    ):
+        super().__init__(
+            _THREAD_CONTEXT,
+            threads,
+            initializer,
+            initargs,
+            startup_timeout=startup_timeout,
+            affinity=affinity,
+        )
+
+    def wait_ready(self) -> List[float]:
+        init_times = super().wait_ready()
+        # Threads are already a part of the parent process
+        self.pids = []
+        return init_times
+
+    def broadcast(self, func: Callable, *args) -> list:
+        """
+        The state is shared by all the threads, so the function runs once
+        """
+        return [func(*args)]
+
+
+class WorkerPoolCache:
+    """
+    Keeps worker pools alive between the runs of an experiment, so the
+    processes are not started again, and the engine SDKs not imported again,
+    for every search config. A pool is reused only by the runs with the same
+    key, which must describe everything fixed at the worker start.
+
+    Only the pool of the last requested key is kept: the idle processes of
+    the other ones would hold their engine connections open for the rest of
+    the experiment.
+    """
+
+    def __init__(self):
+        self._pools: Dict[Hashable, WorkerPool] = {}
+
+    def get(
+        self, key: Hashable, factory: Callable[[], WorkerPool]
+    ) -> Tuple[WorkerPool, bool]:
+        """
+        :return: the pool and whether it was just created by the factory
+        """
+        if key in self._pools and self._pools[key].broken:
+            self.discard(key)
+        for other in list(self._pools):
+            if other != key:
+                self.discard(other)
+        if key in self._pools:
+            return self._pools[key], False
+        pool = factory()
+        self._pools[key] = pool
+        return pool, True
+
+    def discard(self, key: Hashable):
+        """
+        Terminates a pool which can't be reused, e.g. after a failed run
+        """
+        pool = self._pools.pop(key, None)
+        if pool is not None:
+            pool.pool.terminate()
+
+    def close(self):
+        for key in list(self._pools):
+            self.discard(key)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -2,11 +2,18 @@ import multiprocessing as mp
 import uuid
 from typing import List, Tuple
 
+import httpx
 from elasticsearch import Elasticsearch
 
 from dataset_reader.base_reader import Query
 from engine.base_client.search import BaseSearcher
-from engine.clients.elasticsearch.config import ELASTIC_INDEX, get_es_client
+from engine.clients.elasticsearch.config import (
+    ELASTIC_INDEX,
+    ELASTIC_PASSWORD,
+    ELASTIC_PORT,
+    ELASTIC_USER,
+    get_es_client,
+)
 from engine.clients.elasticsearch.parser import ElasticConditionParser
 
 
@@ -18,7 +25,10 @@ class ClosableElastic(Elasticsearch):
 class ElasticSearcher(BaseSearcher):
     search_params = {}
     client: Elasticsearch = None
+    async_client: httpx.AsyncClient = None
     parser = ElasticConditionParser()
+    host = None
+    connection_params = {}
 
     @classmethod
     def get_mp_start_method(cls):
@@ -28,9 +38,11 @@ class ElasticSearcher(BaseSearcher):
     def init_client(cls, host, _distance, connection_params: dict, search_params: dict):
         cls.client = get_es_client(host, connection_params)
         cls.search_params = search_params
+        cls.host = host
+        cls.connection_params = connection_params
 
     @classmethod
-    def search_one(cls, query: Query, top: int) -> List[Tuple[int, float]]:
+    def _build_knn(cls, query: Query, top: int) -> dict:
         knn = {
             "field": "vector",
             "query_vector": query.vector,
@@ -41,13 +53,68 @@ class ElasticSearcher(BaseSearcher):
         meta_conditions = cls.parser.parse(query.meta_conditions)
         if meta_conditions:
             knn["filter"] = meta_conditions
+        return knn
+
+    @classmethod
+    def _parse_response(cls, res) -> List[Tuple[int, float]]:
+        result = [
+            (uuid.UUID(hex=hit["_id"]).int, hit["_score"])
+            for hit in res["hits"]["hits"]
+        ]
+        cls.decode_done()
+        return result
 
+    @classmethod
+    def search_one(cls, query: Query, top: int) -> List[Tuple[int, float]]:
         res = cls.client.search(
             index=ELASTIC_INDEX,
-            knn=knn,
+            knn=cls._build_knn(query, top),
             size=top,
         )
-        return [
-            (uuid.UUID(hex=hit["_id"]).int, hit["_score"])
-            for hit in res["hits"]["hits"]
-        ]
+        # The client decodes the JSON response on its own
+        cls.response_received()
+        return cls._parse_response(res)
+
+    @classmethod
+    def search_batch(
+        cls, queries: List[Query], top: int
+    ) -> List[List[Tuple[int, float]]]:
+        searches = []
+        for query in queries:
+            searches.append({})
+            searches.append({"knn": cls._build_knn(query, top), "size": top})
+        res = cls.client.msearch(index=ELASTIC_INDEX, searches=searches)
+
+        results = []
+        for response in res["responses"]:
+            if "error" in response:
+                raise RuntimeError(f"Search in a batch failed: {response['error']}")
+            results.append(cls._parse_response(response))
+        return results
+
+    @classmethod
+    def init_async_client(cls):
+        # The async flavour of the official client requires aiohttp, plain
+        # REST calls over httpx are enough for the search endpoint
+        cls.async_client = httpx.AsyncClient(
+            base_url=f"http://{cls.host}:{ELASTIC_PORT}",
+            auth=(ELASTIC_USER, ELASTIC_PASSWORD),
+            timeout=cls.connection_params.get("request_timeout", 90),
+            limits=httpx.Limits(max_connections=None),
+        )
+
+    @classmethod
+    async def search_one_async(cls, query: Query, top: int) -> List[Tuple[int, float]]:
+        response = await cls.async_client.post(
+            f"/{ELASTIC_INDEX}/_search",
+            json={"knn": cls._build_knn(query, top), "size": top},
+        )
+        cls.response_received()
+        response.raise_for_status()
+        return cls._parse_response(response.json())
+
+    @classmethod
+    async def delete_async_client(cls):
+        if cls.async_client is not None:
+            await cls.async_client.aclose()
+            cls.async_client = None
@@ -1,10 +1,12 @@
 import multiprocessing as mp
+import time
 import uuid
 from typing import List
 
 from elasticsearch import Elasticsearch
 
 from dataset_reader.base_reader import Record
+from engine.base_client.readiness import IndexBuildError, IndexStatus
 from engine.base_client.upload import BaseUploader
 from engine.clients.elasticsearch.config import ELASTIC_INDEX, get_es_client
 
@@ -17,6 +19,7 @@ class ClosableElastic(Elasticsearch):
 class ElasticUploader(BaseUploader):
     client: Elasticsearch = None
     upload_params = {}
+    upserts = True
 
     @classmethod
     def get_mp_start_method(cls):
@@ -40,9 +43,39 @@ class ElasticUploader(BaseUploader):
             operations=operations,
         )
 
+    @classmethod
+    def delete_batch(cls, ids: List[int]):
+        operations = [
+            {"delete": {"_id": uuid.UUID(int=record_id).hex}} for record_id in ids
+        ]
+        cls.client.bulk(index=ELASTIC_INDEX, operations=operations)
+
+    @classmethod
+    def index_ready(cls) -> bool:
+        # Changes become searchable on refresh, force it instead of waiting
+        # for the periodic one
+        cls.client.indices.refresh(index=ELASTIC_INDEX)
+        return True
+
     @classmethod
     def post_upload(cls, _distance):
-        cls.client.indices.forcemerge(
-            index=ELASTIC_INDEX, wait_for_completion=True, max_num_segments=1
+        # A background task polled for completion, a blocking request would
+        # hold the connection and hit the request timeout on large indexes
+        submitted_at = time.perf_counter()
+        response = cls.client.indices.forcemerge(
+            index=ELASTIC_INDEX, wait_for_completion=False, max_num_segments=1
         )
-        return {}
+        task_id = response["task"]
+
+        def status() -> IndexStatus:
+            task = cls.client.tasks.get(task_id=task_id)
+            if "error" in task:
+                raise IndexBuildError(f"Forcemerge failed: {task['error']}")
+            if not task["completed"]:
+                return IndexStatus(False)
+            # The running time measured by the engine, the polls only notice
+            # the completion up to `max_interval` later
+            running_time = task["task"]["running_time_in_nanos"] / 1e9
+            return IndexStatus(True, completed_at=submitted_at + running_time)
+
+        return {"index": cls.wait_index(status, confirmations=1)}
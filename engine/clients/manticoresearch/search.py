@@ -1,7 +1,13 @@
+import json
 import multiprocessing as mp
 from typing import List, Tuple
 from urllib.parse import urljoin
 
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 from dataset_reader.base_reader import Query
 from engine.base_client.search import BaseSearcher
 from engine.clients.manticoresearch.config import (
@@ -10,14 +16,13 @@ from engine.clients.manticoresearch.config import (
     set_table_name,
 )
 from engine.clients.manticoresearch.parser import ManticoreSearchConditionParser
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+
 
 class ManticoreSearchSearcher(BaseSearcher):
     connection_params = {}
     search_params = {}
     parser = ManticoreSearchConditionParser()
+    async_client: httpx.AsyncClient = None
 
     def __init__(self, host, connection_params, search_params):
         super().__init__(host, connection_params, search_params)
@@ -53,7 +58,7 @@ class ManticoreSearchSearcher(BaseSearcher):
         }
 
     @classmethod
-    def search_one(cls, query: Query, top: int) -> List[Tuple[int, float]]:
+    def _build_request(cls, query: Query, top: int) -> dict:
         if query.vector is None:
             raise ValueError("ManticoreSearch does not support sparse queries.")
 
@@ -64,8 +69,8 @@ class ManticoreSearchSearcher(BaseSearcher):
                 "field": "vector",
                 "query_vector": query.vector,
                 "k": top,
-#                "rescore": True,
-#                "oversampling": 3.0,
+                #                "rescore": True,
+                #                "oversampling": 3.0,
                 **cls.search_params.get("options", {}),
             },
             "limit": top,
@@ -74,5 +79,64 @@ class ManticoreSearchSearcher(BaseSearcher):
         meta_conditions = cls.parser.parse(query.meta_conditions)
         if meta_conditions:
             knn["query"] = meta_conditions
-        res = cls.session.post(cls.base_url, json=knn, **cls.connection_params).json()
-        return [(int(hit["_id"]) - 1, hit["_knn_dist"]) for hit in res["hits"]["hits"]]
+        return knn
+
+    @classmethod
+    def _parse_response(cls, res: dict) -> List[Tuple[int, float]]:
+        result = [
+            (int(hit["_id"]) - 1, hit["_knn_dist"]) for hit in res["hits"]["hits"]
+        ]
+        cls.decode_done()
+        return result
+
+    @classmethod
+    def search_one(cls, query: Query, top: int) -> List[Tuple[int, float]]:
+        knn = cls._build_request(query, top)
+        data = json.dumps(knn).encode()
+        cls.encode_done()
+        response = cls.session.post(cls.base_url, data=data, **cls.connection_params)
+        cls.response_received()
+        return cls._parse_response(response.json())
+
+    @classmethod
+    def prepare_query(cls, query: Query, top: int) -> bytes:
+        return json.dumps(cls._build_request(query, top)).encode()
+
+    @classmethod
+    def search_prepared(cls, prepared: bytes) -> List[Tuple[int, float]]:
+        response = cls.session.post(
+            cls.base_url, data=prepared, **cls.connection_params
+        )
+        cls.response_received()
+        return cls._parse_response(response.json())
+
+    @classmethod
+    def init_async_client(cls):
+        cls.async_client = httpx.AsyncClient(
+            headers={"Content-Type": "application/json"},
+            timeout=cls.connection_params.get("timeout"),
+            transport=httpx.AsyncHTTPTransport(
+                retries=5, limits=httpx.Limits(max_connections=None)
+            ),
+        )
+
+    @classmethod
+    async def search_one_async(cls, query: Query, top: int) -> List[Tuple[int, float]]:
+        knn = cls._build_request(query, top)
+        content = json.dumps(knn).encode()
+        cls.encode_done()
+        response = await cls.async_client.post(cls.base_url, content=content)
+        cls.response_received()
+        return cls._parse_response(response.json())
+
+    @classmethod
+    async def search_prepared_async(cls, prepared: bytes) -> List[Tuple[int, float]]:
+        response = await cls.async_client.post(cls.base_url, content=prepared)
+        cls.response_received()
+        return cls._parse_response(response.json())
+
+    @classmethod
+    async def delete_async_client(cls):
+        if cls.async_client is not None:
+            await cls.async_client.aclose()
+            cls.async_client = None
@@ -1,22 +1,25 @@
+import json
 import multiprocessing as mp
-from typing import List
+from typing import List, Tuple
+
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+
+from dataset_reader.base_reader import Record
+from engine.base_client.upload import BaseUploader
 from engine.clients.manticoresearch.config import (
     MANTICORESEARCH_PORT,
     get_table_name,
     set_table_name,
 )
 
-from dataset_reader.base_reader import Record
-from engine.base_client.upload import BaseUploader
-import json
 
 class ClosableSession(requests.Session):
     def __del__(self):
         self.close()
 
+
 class ManticoreSearchUploader(BaseUploader):
     api_url = None
     session: requests.Session = None
@@ -67,6 +70,11 @@ class ManticoreSearchUploader(BaseUploader):
 
     @classmethod
     def upload_batch(cls, batch: List[Record]):
+        cls.upload_encoded(cls.encode_batch(batch))
+
+    @classmethod
+    def encode_batch(cls, batch: List[Record]) -> Tuple[str, List[int]]:
+        """NDJSON body of the /bulk request and the ids it inserts"""
         docs = []
         record_ids = []
         for record in batch:
@@ -86,6 +94,11 @@ class ManticoreSearchUploader(BaseUploader):
             record_ids.append(record_id)
 
         payload = "\n".join(json.dumps(item) for item in docs) + "\n"
+        return payload, record_ids
+
+    @classmethod
+    def upload_encoded(cls, encoded: Tuple[str, List[int]]):
+        payload, record_ids = encoded
         response = cls.session.post(
             f"{cls.api_url}/bulk", data=payload, **cls.connection_params
         )
@@ -97,7 +110,9 @@ class ManticoreSearchUploader(BaseUploader):
                 body = response.json()
                 if isinstance(body, dict):
                     current_line = body.get("current_line")
-                    if isinstance(current_line, int) and 1 <= current_line <= len(record_ids):
+                    if isinstance(current_line, int) and 1 <= current_line <= len(
+                        record_ids
+                    ):
                         details = (
                             f"{details}\n"
                             f"bulk current_line={current_line}, record_id={record_ids[current_line-1]}, "
@@ -108,6 +123,18 @@ class ManticoreSearchUploader(BaseUploader):
             print(f"Manticore bulk error {response.status_code}: {details}")
             raise
 
+    @classmethod
+    def delete_batch(cls, ids: List[int]):
+        docs = [
+            {"delete": {"table": get_table_name(), "id": record_id + 1}}
+            for record_id in ids
+        ]
+        payload = "\n".join(json.dumps(item) for item in docs) + "\n"
+        response = cls.session.post(
+            f"{cls.api_url}/bulk", data=payload, **cls.connection_params
+        )
+        response.raise_for_status()
+
     @classmethod
     def post_upload(cls, _distance):
         optimize_cutoff = cls.upload_params.get("optimize_cutoff", 1)
@@ -129,7 +156,7 @@ class ManticoreSearchUploader(BaseUploader):
         if optimize_timeout is not None:
             request_params["timeout"] = optimize_timeout
         response = cls.session.post(
-            f"{cls.api_url}/sql?mode=raw", 
+            f"{cls.api_url}/sql?mode=raw",
             data=f"query=OPTIMIZE%20TABLE%20%60{get_table_name()}%60%20OPTION%20sync%3D1%20%2Ccutoff%3D{optimize_cutoff}",
             **request_params,
         )
@@ -56,4 +56,33 @@ class MilvusSearcher(BaseSearcher):
 
             raise e
 
-        return list(zip(res[0].ids, res[0].distances))
+        cls.response_received()
+        result = list(zip(res[0].ids, res[0].distances))
+        cls.decode_done()
+        return result
+
+    @classmethod
+    def search_batch(
+        cls, queries: List[Query], top: int
+    ) -> List[List[Tuple[int, float]]]:
+        param = {"metric_type": cls.distance, "params": cls.search_params["config"]}
+
+        # A multi-vector search accepts a single filter expression, so the
+        # queries are sent in one request per distinct filter
+        groups = {}
+        for i, query in enumerate(queries):
+            expr = cls.parser.parse(query.meta_conditions)
+            groups.setdefault(expr, []).append(i)
+
+        results = [None] * len(queries)
+        for expr, indices in groups.items():
+            res = cls.collection.search(
+                data=[queries[i].vector for i in indices],
+                anns_field="vector",
+                param=param,
+                limit=top,
+                expr=expr,
+            )
+            for i, hits in zip(indices, res):
+                results[i] = list(zip(hits.ids, hits.distances))
+        return results
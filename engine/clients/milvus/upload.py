@@ -1,14 +1,10 @@
 import multiprocessing as mp
 from typing import List
 
-from pymilvus import (
-    Collection,
-    MilvusException,
-    connections,
-    wait_for_index_building_complete,
-)
+from pymilvus import Collection, MilvusException, connections, utility
 
 from dataset_reader.base_reader import Record
+from engine.base_client.readiness import IndexBuildError, IndexStatus
 from engine.base_client.upload import BaseUploader
 from engine.clients.milvus.config import (
     DISTANCE_MAPPING,
@@ -35,7 +31,7 @@ class MilvusUploader(BaseUploader):
             alias=MILVUS_DEFAULT_ALIAS,
             host=host,
             port=str(connection_params.get("port", MILVUS_DEFAULT_PORT)),
-            **connection_params
+            **connection_params,
         )
         cls.collection = Collection(MILVUS_COLLECTION_NAME, using=MILVUS_DEFAULT_ALIAS)
         cls.upload_params = upload_params
@@ -64,6 +60,32 @@ class MilvusUploader(BaseUploader):
 
         cls.collection.insert([ids, vectors] + field_values)
 
+    @classmethod
+    def delete_batch(cls, ids: List[int]):
+        cls.collection.delete(f"id in {list(ids)}")
+
+    @classmethod
+    def index_ready(cls) -> bool:
+        return cls.index_status().ready
+
+    @classmethod
+    def index_status(cls) -> IndexStatus:
+        # Rows of all the indexes, the vector and the scalar ones
+        indexed, total = 0, 0
+        for index in cls.collection.indexes:
+            progress = utility.index_building_progress(
+                MILVUS_COLLECTION_NAME,
+                index_name=index.index_name,
+                using=MILVUS_DEFAULT_ALIAS,
+            )
+            if progress.get("state") == "Failed":
+                raise IndexBuildError(
+                    f"Milvus failed to build the index {index.index_name}: {progress}"
+                )
+            indexed += progress["indexed_rows"]
+            total += progress["total_rows"]
+        return IndexStatus(ready=indexed >= total, indexed=indexed, total=total)
+
     @classmethod
     def post_upload(cls, distance):
         index_params = {
@@ -85,12 +107,7 @@ class MilvusUploader(BaseUploader):
                 if 1 != e.code:
                     raise e
 
-        for index in cls.collection.indexes:
-            wait_for_index_building_complete(
-                MILVUS_COLLECTION_NAME,
-                index_name=index.index_name,
-                using=MILVUS_DEFAULT_ALIAS,
-            )
+        index_stats = cls.wait_index()
 
         cls.collection.load()
-        return {}
+        return {"index": index_stats}
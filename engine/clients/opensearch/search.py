@@ -2,6 +2,7 @@ import multiprocessing as mp
 import uuid
 from typing import List, Tuple
 
+import httpx
 from opensearchpy import OpenSearch
 
 from dataset_reader.base_reader import Query
@@ -23,7 +24,10 @@ class ClosableOpenSearch(OpenSearch):
 class OpenSearchSearcher(BaseSearcher):
     search_params = {}
     client: OpenSearch = None
+    async_client: httpx.AsyncClient = None
     parser = OpenSearchConditionParser()
+    host = None
+    connection_params = {}
 
     @classmethod
     def get_mp_start_method(cls):
@@ -45,9 +49,11 @@ class OpenSearchSearcher(BaseSearcher):
             **init_params,
         )
         cls.search_params = search_params
+        cls.host = host
+        cls.connection_params = init_params
 
     @classmethod
-    def search_one(cls, query: Query, top: int) -> List[Tuple[int, float]]:
+    def _build_query(cls, query: Query, top: int) -> dict:
         opensearch_query = {
             "knn": {
                 "vector": {
@@ -61,20 +67,83 @@ class OpenSearchSearcher(BaseSearcher):
         if meta_conditions:
             opensearch_query["knn"]["vector"]["filter"] = meta_conditions
 
+        return {
+            "query": opensearch_query,
+            "size": top,
+        }
+
+    @classmethod
+    def _parse_response(cls, res) -> List[Tuple[int, float]]:
+        result = [
+            (uuid.UUID(hex=hit["_id"]).int, hit["_score"])
+            for hit in res["hits"]["hits"]
+        ]
+        cls.decode_done()
+        return result
+
+    @classmethod
+    def search_one(cls, query: Query, top: int) -> List[Tuple[int, float]]:
         res = cls.client.search(
             index=OPENSEARCH_INDEX,
-            body={
-                "query": opensearch_query,
-                "size": top,
+            body=cls._build_query(query, top),
+            params={
+                "timeout": 60,
             },
+        )
+        # The client decodes the JSON response on its own
+        cls.response_received()
+        return cls._parse_response(res)
+
+    @classmethod
+    def search_batch(
+        cls, queries: List[Query], top: int
+    ) -> List[List[Tuple[int, float]]]:
+        body = []
+        for query in queries:
+            body.append({})
+            body.append(cls._build_query(query, top))
+        res = cls.client.msearch(
+            body=body,
+            index=OPENSEARCH_INDEX,
             params={
                 "timeout": 60,
             },
         )
-        return [
-            (uuid.UUID(hex=hit["_id"]).int, hit["_score"])
-            for hit in res["hits"]["hits"]
-        ]
+
+        results = []
+        for response in res["responses"]:
+            if "error" in response:
+                raise RuntimeError(f"Search in a batch failed: {response['error']}")
+            results.append(cls._parse_response(response))
+        return results
+
+    @classmethod
+    def init_async_client(cls):
+        # The async flavour of opensearch-py requires aiohttp, plain REST calls
+        # over httpx are enough for the search endpoint
+        cls.async_client = httpx.AsyncClient(
+            base_url=f"http://{cls.host}:{OPENSEARCH_PORT}",
+            auth=(OPENSEARCH_USER, OPENSEARCH_PASSWORD),
+            timeout=cls.connection_params["request_timeout"],
+            limits=httpx.Limits(max_connections=None),
+        )
+
+    @classmethod
+    async def search_one_async(cls, query: Query, top: int) -> List[Tuple[int, float]]:
+        response = await cls.async_client.post(
+            f"/{OPENSEARCH_INDEX}/_search",
+            json=cls._build_query(query, top),
+            params={"timeout": 60},
+        )
+        cls.response_received()
+        response.raise_for_status()
+        return cls._parse_response(response.json())
+
+    @classmethod
+    async def delete_async_client(cls):
+        if cls.async_client is not None:
+            await cls.async_client.aclose()
+            cls.async_client = None
 
     @classmethod
     def setup_search(cls):
@@ -22,6 +22,7 @@ class ClosableOpenSearch(OpenSearch):
 class OpenSearchUploader(BaseUploader):
     client: OpenSearch = None
     upload_params = {}
+    upserts = True
 
     @classmethod
     def get_mp_start_method(cls):
@@ -60,6 +61,26 @@ class OpenSearchUploader(BaseUploader):
             },
         )
 
+    @classmethod
+    def delete_batch(cls, ids: List[int]):
+        operations = [
+            {"delete": {"_id": uuid.UUID(int=record_id).hex}} for record_id in ids
+        ]
+        cls.client.bulk(
+            index=OPENSEARCH_INDEX,
+            body=operations,
+            params={
+                "timeout": 300,
+            },
+        )
+
+    @classmethod
+    def index_ready(cls) -> bool:
+        # Changes become searchable on refresh, force it instead of waiting
+        # for the periodic one
+        cls.client.indices.refresh(index=OPENSEARCH_INDEX)
+        return True
+
     @classmethod
     def post_upload(cls, _distance):
         cls.client.indices.forcemerge(
@@ -1,3 +1,4 @@
+import threading
 from typing import List, Tuple
 
 import numpy as np
@@ -17,13 +18,22 @@ class PgVectorSearcher(BaseSearcher):
     distance = None
     search_params = {}
     parser = PgVectorConditionParser()
+    # Connections of the `executor: thread` mode, psycopg cursors can't be
+    # shared between threads
+    _local = threading.local()
+    _thread_connections = []
+
+    @classmethod
+    def _connect(cls, host, connection_params: dict, search_params: dict):
+        conn = psycopg.connect(**get_db_config(host, connection_params))
+        register_vector(conn)
+        cur = conn.cursor()
+        cur.execute(f"SET hnsw.ef_search = {search_params['config']['hnsw_ef']}")
+        return conn, cur
 
     @classmethod
     def init_client(cls, host, distance, connection_params: dict, search_params: dict):
-        cls.conn = psycopg.connect(**get_db_config(host, connection_params))
-        register_vector(cls.conn)
-        cls.cur = cls.conn.cursor()
-        cls.cur.execute(f"SET hnsw.ef_search = {search_params['config']['hnsw_ef']}")
+        cls.conn, cls.cur = cls._connect(host, connection_params, search_params)
         if distance == Distance.COSINE:
             cls.query = "SELECT id, embedding <=> %s AS _score FROM items ORDER BY _score LIMIT %s"
         elif distance == Distance.L2:
@@ -31,16 +41,27 @@ class PgVectorSearcher(BaseSearcher):
         else:
             raise NotImplementedError(f"Unsupported distance metric {cls.distance}")
 
+    @classmethod
+    def init_thread(cls, host, distance, connection_params: dict, search_params: dict):
+        cls._local.conn, cls._local.cur = cls._connect(
+            host, connection_params, search_params
+        )
+        cls._thread_connections.append(cls._local.conn)
+
     @classmethod
     def search_one(cls, query: Query, top) -> List[Tuple[int, float]]:
+        cur = getattr(cls._local, "cur", cls.cur)
         # TODO: Use query.metaconditions for datasets with filtering
-        cls.cur.execute(
-            cls.query, (np.array(query.vector), top), binary=True, prepare=True
-        )
-        return cls.cur.fetchall()
+        cur.execute(cls.query, (np.array(query.vector), top), binary=True, prepare=True)
+        cls.response_received()
+        result = cur.fetchall()
+        cls.decode_done()
+        return result
 
     @classmethod
     def delete_client(cls):
         if cls.cur:
             cls.cur.close()
             cls.conn.close()
+        while cls._thread_connections:
+            cls._thread_connections.pop().close()
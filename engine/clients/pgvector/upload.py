@@ -1,3 +1,6 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import List
 
 import numpy as np
@@ -7,6 +10,7 @@ from pgvector.psycopg import register_vector
 from dataset_reader.base_reader import Record
 from engine.base_client import IncompatibilityError
 from engine.base_client.distances import Distance
+from engine.base_client.readiness import IndexStatus
 from engine.base_client.upload import BaseUploader
 from engine.clients.pgvector.config import get_db_config
 
@@ -18,15 +22,32 @@ class PgVectorUploader(BaseUploader):
     }
     conn = None
     cur = None
+    host = None
+    connection_params = {}
     upload_params = {}
+    # Connections of the `executor: thread` mode, psycopg cursors can't be
+    # shared between threads
+    _local = threading.local()
+    _thread_connections = []
+
+    @classmethod
+    def _connect(cls, host, connection_params):
+        conn = psycopg.connect(**get_db_config(host, connection_params))
+        register_vector(conn)
+        return conn, conn.cursor()
 
     @classmethod
     def init_client(cls, host, distance, connection_params, upload_params):
-        cls.conn = psycopg.connect(**get_db_config(host, connection_params))
-        register_vector(cls.conn)
-        cls.cur = cls.conn.cursor()
+        cls.conn, cls.cur = cls._connect(host, connection_params)
+        cls.host = host
+        cls.connection_params = connection_params
         cls.upload_params = upload_params
 
+    @classmethod
+    def init_thread(cls, host, distance, connection_params, upload_params):
+        cls._local.conn, cls._local.cur = cls._connect(host, connection_params)
+        cls._thread_connections.append(cls._local.conn)
+
     @classmethod
     def upload_batch(cls, batch: List[Record]):
         ids, vectors = [], []
@@ -35,14 +56,20 @@ class PgVectorUploader(BaseUploader):
             vectors.append(record.vector)
 
         vectors = np.array(vectors)
+        cur = getattr(cls._local, "cur", cls.cur)
         # Copy is faster than insert
-        with cls.cur.copy(
+        with cur.copy(
             "COPY items (id, embedding) FROM STDIN WITH (FORMAT BINARY)"
         ) as copy:
             copy.set_types(["integer", "vector"])
             for i, embedding in zip(ids, vectors):
                 copy.write_row((i, embedding))
 
+    @classmethod
+    def delete_batch(cls, ids: List[int]):
+        cur = getattr(cls._local, "cur", cls.cur)
+        cur.execute("DELETE FROM items WHERE id = ANY(%s)", (ids,))
+
     @classmethod
     def post_upload(cls, distance):
         try:
@@ -52,14 +79,50 @@ class PgVectorUploader(BaseUploader):
 
         cls.conn.execute("SET max_parallel_workers = 128")
         cls.conn.execute("SET max_parallel_maintenance_workers = 128")
-        cls.conn.execute(
-            f"CREATE INDEX ON items USING hnsw (embedding {hnsw_distance_type}) WITH (m = {cls.upload_params['hnsw_config']['m']}, ef_construction = {cls.upload_params['hnsw_config']['ef_construct']})"
-        )
+        query = f"CREATE INDEX ON items USING hnsw (embedding {hnsw_distance_type}) WITH (m = {cls.upload_params['hnsw_config']['m']}, ef_construction = {cls.upload_params['hnsw_config']['ef_construct']})"
 
-        return {}
+        # The build blocks its connection, the progress is polled on another one
+        progress_conn, progress_cur = cls._connect(cls.host, cls.connection_params)
+        try:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                build = executor.submit(cls._build_index, query)
+                index_stats = cls.wait_index(
+                    lambda: cls._build_status(progress_cur, build), confirmations=1
+                )
+                # Raises the error of a failed build
+                build.result()
+        finally:
+            progress_conn.close()
+
+        return {"index": index_stats}
+
+    @classmethod
+    def _build_index(cls, query: str) -> float:
+        """
+        :return: `perf_counter` time the build completed at, the polls only
+            notice it up to `max_interval` later
+        """
+        cls.conn.execute(query)
+        return time.perf_counter()
+
+    @classmethod
+    def _build_status(cls, cur, build: Future) -> IndexStatus:
+        done = build.done()
+        completed_at = build.result() if done and not build.exception() else None
+        progress = cur.execute(
+            "SELECT tuples_done, tuples_total FROM pg_stat_progress_create_index"
+            " WHERE relid = 'items'::regclass"
+        ).fetchone()
+        if progress is None:
+            return IndexStatus(done, completed_at=completed_at)
+        return IndexStatus(
+            done, indexed=progress[0], total=progress[1], completed_at=completed_at
+        )
 
     @classmethod
     def delete_client(cls):
         if cls.cur:
             cls.cur.close()
             cls.conn.close()
+        while cls._thread_connections:
+            cls._thread_connections.pop().close()
@@ -35,17 +35,19 @@ class QdrantSearcher(BaseSearcher):
     #     return "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
 
     @classmethod
-    def search_one(cls, query: Query, top: int) -> List[Tuple[int, float]]:
-
+    def _query_vector(cls, query: Query):
         # Can query only one till we introduce re-ranking in the benchmarks
         if query.sparse_vector is None:
-            query_vector = query.vector
-        else:
-            query_vector = construct(
-                models.SparseVector,
-                indices=query.sparse_vector.indices,
-                values=query.sparse_vector.values,
-            )
+            return query.vector
+        return construct(
+            models.SparseVector,
+            indices=query.sparse_vector.indices,
+            values=query.sparse_vector.values,
+        )
+
+    @classmethod
+    def search_one(cls, query: Query, top: int) -> List[Tuple[int, float]]:
+        query_vector = cls._query_vector(query)
 
         prefetch = cls.search_params.get("prefetch")
 
@@ -71,4 +73,41 @@ class QdrantSearcher(BaseSearcher):
         except Exception as ex:
             print(f"Something went wrong during search: {ex}")
             raise ex
-        return [(hit.id, hit.score) for hit in res.points]
+        cls.response_received()
+        result = [(hit.id, hit.score) for hit in res.points]
+        cls.decode_done()
+        return result
+
+    @classmethod
+    def search_batch(
+        cls, queries: List[Query], top: int
+    ) -> List[List[Tuple[int, float]]]:
+        prefetch = cls.search_params.get("prefetch")
+        requests = []
+        for query in queries:
+            query_vector = cls._query_vector(query)
+            requests.append(
+                models.QueryRequest(
+                    using="sparse" if query.sparse_vector else None,
+                    prefetch=(
+                        models.Prefetch(**prefetch, query=query_vector)
+                        if prefetch
+                        else None
+                    ),
+                    query=query_vector,
+                    filter=cls.parser.parse(query.meta_conditions),
+                    limit=top,
+                    params=models.SearchParams(**cls.search_params.get("config", {})),
+                    with_payload=cls.search_params.get("with_payload", False),
+                )
+            )
+
+        try:
+            responses = cls.client.query_batch_points(
+                collection_name=QDRANT_COLLECTION_NAME,
+                requests=requests,
+            )
+        except Exception as ex:
+            print(f"Something went wrong during search: {ex}")
+            raise ex
+        return [[(hit.id, hit.score) for hit in res.points] for res in responses]
@@ -1,5 +1,4 @@
 import os
-import time
 from typing import List
 
 from qdrant_client import QdrantClient
@@ -8,10 +7,12 @@ from qdrant_client.http.models import (
     Batch,
     CollectionStatus,
     OptimizersConfigDiff,
+    PointIdsList,
     SparseVector,
 )
 
 from dataset_reader.base_reader import Record
+from engine.base_client.readiness import IndexStatus
 from engine.base_client.upload import BaseUploader
 from engine.clients.qdrant.config import QDRANT_API_KEY, QDRANT_COLLECTION_NAME
 
@@ -19,6 +20,7 @@ from engine.clients.qdrant.config import QDRANT_API_KEY, QDRANT_COLLECTION_NAME
 class QdrantUploader(BaseUploader):
     client = None
     upload_params = {}
+    upserts = True
 
     @classmethod
     def init_client(cls, host, distance, connection_params, upload_params):
@@ -58,6 +60,27 @@ class QdrantUploader(BaseUploader):
             wait=False,
         )
 
+    @classmethod
+    def delete_batch(cls, ids: List[int]):
+        cls.client.delete(
+            collection_name=QDRANT_COLLECTION_NAME,
+            points_selector=PointIdsList(points=ids),
+            wait=False,
+        )
+
+    @classmethod
+    def index_ready(cls) -> bool:
+        return cls.index_status().ready
+
+    @classmethod
+    def index_status(cls) -> IndexStatus:
+        collection_info = cls.client.get_collection(QDRANT_COLLECTION_NAME)
+        return IndexStatus(
+            ready=collection_info.status == CollectionStatus.GREEN,
+            indexed=collection_info.indexed_vectors_count,
+            total=collection_info.points_count,
+        )
+
     @classmethod
     def post_upload(cls, _distance):
         # If index building is disabled through the collection settings, enable it
@@ -72,24 +95,13 @@ class QdrantUploader(BaseUploader):
                 ),
             )
 
-        cls.wait_collection_green()
-        return {}
+        return {"index": cls.wait_collection_green()}
 
     @classmethod
-    def wait_collection_green(cls):
-        wait_time = 5.0
-        total = 0
-        while True:
-            time.sleep(wait_time)
-            total += wait_time
-            collection_info = cls.client.get_collection(QDRANT_COLLECTION_NAME)
-            if collection_info.status != CollectionStatus.GREEN:
-                continue
-            time.sleep(wait_time)
-            collection_info = cls.client.get_collection(QDRANT_COLLECTION_NAME)
-            if collection_info.status == CollectionStatus.GREEN:
-                break
-        return total
+    def wait_collection_green(cls) -> dict:
+        # Green for a moment may be a pause between two optimizations, so it
+        # has to hold for 5 seconds
+        return cls.wait_index(confirmations=6, confirmation_interval=1.0)
 
     @classmethod
     def delete_client(cls):
@@ -1,3 +1,4 @@
+import json
 from typing import List, Tuple
 
 import httpx
@@ -11,9 +12,11 @@ from engine.clients.qdrant_native.parser import QdrantNativeConditionParser
 class QdrantNativeSearcher(BaseSearcher):
     search_params = {}
     client: httpx.Client = None
+    async_client: httpx.AsyncClient = None
     parser = QdrantNativeConditionParser()
     host = None
     headers = {}
+    timeout: httpx.Timeout = None
 
     @classmethod
     def init_client(cls, host, distance, connection_params: dict, search_params: dict):
@@ -28,20 +31,20 @@ class QdrantNativeSearcher(BaseSearcher):
         # Create HTTP client
         # Use longer timeout for write operations to handle large query payloads
         base_timeout = connection_params.get("timeout", 30)
+        cls.timeout = httpx.Timeout(
+            connect=base_timeout,
+            read=base_timeout,
+            write=base_timeout * 5,  # 5x longer for writes
+            pool=base_timeout,
+        )
         cls.client = httpx.Client(
             headers=cls.headers,
-            timeout=httpx.Timeout(
-                connect=base_timeout,
-                read=base_timeout,
-                write=base_timeout * 5,  # 5x longer for writes
-                pool=base_timeout,
-            ),
+            timeout=cls.timeout,
             limits=httpx.Limits(max_connections=None, max_keepalive_connections=0),
         )
 
     @classmethod
-    def search_one(cls, query: Query, top: int) -> List[Tuple[int, float]]:
-        """Execute a single search query using REST API"""
+    def _build_request(cls, query: Query, top: int) -> Tuple[str, dict]:
         url = f"{cls.host}/collections/{QDRANT_COLLECTION_NAME}/points/query"
 
         if query.sparse_vector is None:
@@ -80,18 +83,113 @@ class QdrantNativeSearcher(BaseSearcher):
         with_payload = cls.search_params.get("with_payload", False)
         payload["with_payload"] = with_payload
 
+        return url, payload
+
+    @classmethod
+    def _parse_response(cls, response: httpx.Response) -> List[Tuple[int, float]]:
+        cls.response_received()
+        response.raise_for_status()
+        points = response.json()["result"]["points"]
+        result = [(point["id"], point["score"]) for point in points]
+        cls.decode_done()
+        return result
+
+    @classmethod
+    def search_one(cls, query: Query, top: int) -> List[Tuple[int, float]]:
+        """Execute a single search query using REST API"""
+        url, payload = cls._build_request(query, top)
+
         try:
             response = cls.client.post(url, json=payload)
+            return cls._parse_response(response)
+
+        except Exception as ex:
+            print(f"Something went wrong during search: {ex}")
+            raise ex
+
+    @classmethod
+    def prepare_query(cls, query: Query, top: int) -> Tuple[str, bytes]:
+        """Build and encode the request body before the clock starts"""
+        url, payload = cls._build_request(query, top)
+        return url, json.dumps(payload).encode()
+
+    @classmethod
+    def search_prepared(cls, prepared: Tuple[str, bytes]) -> List[Tuple[int, float]]:
+        """Send a request body built by `prepare_query`"""
+        url, content = prepared
+
+        try:
+            response = cls.client.post(url, content=content)
+            return cls._parse_response(response)
+
+        except Exception as ex:
+            print(f"Something went wrong during search: {ex}")
+            raise ex
+
+    @classmethod
+    def search_batch(
+        cls, queries: List[Query], top: int
+    ) -> List[List[Tuple[int, float]]]:
+        """Execute all the queries in a single batch request"""
+        url = f"{cls.host}/collections/{QDRANT_COLLECTION_NAME}/points/query/batch"
+        searches = [cls._build_request(query, top)[1] for query in queries]
+
+        try:
+            response = cls.client.post(url, json={"searches": searches})
             response.raise_for_status()
-            result = response.json()
+            return [
+                [(point["id"], point["score"]) for point in res["points"]]
+                for res in response.json()["result"]
+            ]
+
+        except Exception as ex:
+            print(f"Something went wrong during search: {ex}")
+            raise ex
+
+    @classmethod
+    def init_async_client(cls):
+        """Create async HTTP client, keeping connections alive between requests"""
+        cls.async_client = httpx.AsyncClient(
+            headers=cls.headers,
+            timeout=cls.timeout,
+            limits=httpx.Limits(max_connections=None),
+        )
+
+    @classmethod
+    async def search_one_async(cls, query: Query, top: int) -> List[Tuple[int, float]]:
+        """Execute a single search query using REST API without blocking the loop"""
+        url, payload = cls._build_request(query, top)
+
+        try:
+            response = await cls.async_client.post(url, json=payload)
+            return cls._parse_response(response)
+
+        except Exception as ex:
+            print(f"Something went wrong during search: {ex}")
+            raise ex
+
+    @classmethod
+    async def search_prepared_async(
+        cls, prepared: Tuple[str, bytes]
+    ) -> List[Tuple[int, float]]:
+        """Send a request body built by `prepare_query` without blocking the loop"""
+        url, content = prepared
 
-            points = result["result"]["points"]
-            return [(point["id"], point["score"]) for point in points]
+        try:
+            response = await cls.async_client.post(url, content=content)
+            return cls._parse_response(response)
 
         except Exception as ex:
             print(f"Something went wrong during search: {ex}")
             raise ex
 
+    @classmethod
+    async def delete_async_client(cls):
+        """Cleanup async HTTP client"""
+        if cls.async_client is not None:
+            await cls.async_client.aclose()
+            cls.async_client = None
+
     @classmethod
     def delete_client(cls):
         """Cleanup HTTP client"""
@@ -1,9 +1,10 @@
-import time
+import json
 from typing import List
 
 import httpx
 
 from dataset_reader.base_reader import Record
+from engine.base_client.readiness import IndexStatus
 from engine.base_client.upload import BaseUploader
 from engine.clients.qdrant_native.config import QDRANT_API_KEY, QDRANT_COLLECTION_NAME
 
@@ -11,6 +12,7 @@ from engine.clients.qdrant_native.config import QDRANT_API_KEY, QDRANT_COLLECTIO
 class QdrantNativeUploader(BaseUploader):
     client = None
     upload_params = {}
+    upserts = True
     host = None
     headers = {}
 
@@ -41,16 +43,22 @@ class QdrantNativeUploader(BaseUploader):
     @classmethod
     def upload_batch(cls, batch: List[Record]):
         """Upload a batch of records using REST API"""
+        cls.upload_encoded(cls.encode_batch(batch))
+
+    @classmethod
+    def encode_batch(cls, batch: List[Record]) -> List[bytes]:
+        """Request bodies of the batch"""
         # Qdrant has a 32MB JSON payload limit
         # For large batches with dense high-dim vectors, split into smaller sub-batches
         MAX_BATCH_SIZE = 512
 
-        if len(batch) > MAX_BATCH_SIZE:
-            # Split into smaller sub-batches
-            for i in range(0, len(batch), MAX_BATCH_SIZE):
-                cls.upload_batch(batch[i : i + MAX_BATCH_SIZE])
-            return
+        return [
+            cls._encode_points(batch[i : i + MAX_BATCH_SIZE])
+            for i in range(0, len(batch), MAX_BATCH_SIZE)
+        ]
 
+    @classmethod
+    def _encode_points(cls, batch: List[Record]) -> bytes:
         points = []
         for point in batch:
             point_data = {
@@ -71,14 +79,36 @@ class QdrantNativeUploader(BaseUploader):
 
             points.append(point_data)
 
+        return json.dumps({"points": points}).encode()
+
+    @classmethod
+    def upload_encoded(cls, payload: List[bytes]):
         url = f"{cls.host}/collections/{QDRANT_COLLECTION_NAME}/points"
-        payload = {
-            "points": points,
-        }
+        for body in payload:
+            response = cls.client.put(url, content=body, params={"wait": "false"})
+            response.raise_for_status()
 
-        response = cls.client.put(url, json=payload, params={"wait": "false"})
+    @classmethod
+    def delete_batch(cls, ids: List[int]):
+        url = f"{cls.host}/collections/{QDRANT_COLLECTION_NAME}/points/delete"
+        response = cls.client.post(url, json={"points": ids}, params={"wait": "false"})
         response.raise_for_status()
 
+    @classmethod
+    def index_ready(cls) -> bool:
+        return cls.index_status().ready
+
+    @classmethod
+    def index_status(cls) -> IndexStatus:
+        response = cls.client.get(f"{cls.host}/collections/{QDRANT_COLLECTION_NAME}")
+        response.raise_for_status()
+        collection_info = response.json()["result"]
+        return IndexStatus(
+            ready=collection_info["status"] == "green",
+            indexed=collection_info.get("indexed_vectors_count"),
+            total=collection_info.get("points_count"),
+        )
+
     @classmethod
     def post_upload(cls, _distance):
         """
@@ -107,37 +137,12 @@ class QdrantNativeUploader(BaseUploader):
             response = cls.client.patch(patch_url, json=patch_payload)
             response.raise_for_status()
 
-        cls.wait_collection_green()
-        return {}
+        return {"index": cls.wait_collection_green()}
 
     @classmethod
-    def wait_collection_green(cls):
-        """Wait for collection status to be GREEN"""
-        wait_time = 5.0
-        total = 0
-        url = f"{cls.host}/collections/{QDRANT_COLLECTION_NAME}"
-
-        while True:
-            time.sleep(wait_time)
-            total += wait_time
-
-            response = cls.client.get(url)
-            response.raise_for_status()
-            collection_info = response.json()["result"]
-
-            if collection_info["status"] != "green":
-                continue
-
-            # Check twice to ensure stability
-            time.sleep(wait_time)
-            response = cls.client.get(url)
-            response.raise_for_status()
-            collection_info = response.json()["result"]
-
-            if collection_info["status"] == "green":
-                break
-
-        return total
+    def wait_collection_green(cls) -> dict:
+        """Wait for collection status to be GREEN, held for 5 seconds"""
+        return cls.wait_index(confirmations=6, confirmation_interval=1.0)
 
     @classmethod
     def delete_client(cls):
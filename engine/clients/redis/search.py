@@ -76,6 +76,10 @@ class RedisSearcher(BaseSearcher):
             **cls.search_params["config"],
             **params,
         }
+        cls.encode_done()
         results = cls.search_namespace.search(q, query_params=params_dict)
+        cls.response_received()
 
-        return [(int(result.id), float(result.vector_score)) for result in results.docs]
+        hits = [(int(doc.id), float(doc.vector_score)) for doc in results.docs]
+        cls.decode_done()
+        return hits
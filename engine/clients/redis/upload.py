@@ -17,6 +17,7 @@ from engine.clients.redis.helper import convert_to_redis_coords
 class RedisUploader(BaseUploader):
     client = None
     upload_params = {}
+    upserts = True
 
     @classmethod
     def init_client(cls, host, distance, connection_params, upload_params):
@@ -64,6 +65,17 @@ class RedisUploader(BaseUploader):
             )
         p.execute()
 
+    @classmethod
+    def delete_batch(cls, ids: List[int]):
+        p = cls.client.pipeline(transaction=False)
+        for idx in ids:
+            p.delete(str(idx))
+        p.execute()
+
+    @classmethod
+    def index_ready(cls) -> bool:
+        return float(cls.client.ft().info()["percent_indexed"]) >= 1.0
+
     @classmethod
     def post_upload(cls, _distance):
         return {}
@@ -40,7 +40,10 @@ class WeaviateSearcher(BaseSearcher):
             return_metadata=MetadataQuery(distance=True),
             return_properties=[],
         )
-        return [(hit.uuid.int, hit.metadata.distance) for hit in res.objects]
+        cls.response_received()
+        result = [(hit.uuid.int, hit.metadata.distance) for hit in res.objects]
+        cls.decode_done()
+        return result
 
     def setup_search(self):
         self.collection.config.update(
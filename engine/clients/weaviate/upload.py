@@ -3,6 +3,7 @@ from typing import List
 
 from weaviate import WeaviateClient
 from weaviate.classes.data import DataObject
+from weaviate.classes.query import Filter
 from weaviate.connect import ConnectionParams
 
 from dataset_reader.base_reader import Record
@@ -40,6 +41,12 @@ class WeaviateUploader(BaseUploader):
         if len(objects) > 0:
             cls.collection.data.insert_many(objects)
 
+    @classmethod
+    def delete_batch(cls, ids: List[int]):
+        cls.collection.data.delete_many(
+            where=Filter.by_id().contains_any([uuid.UUID(int=idx) for idx in ids])
+        )
+
     @classmethod
     def delete_client(cls):
         if cls.client is not None:
@@ -25,6 +25,7 @@ def run(
     exit_on_error: bool = typer.Option(True),
     timeout: float = typer.Option(86400.0),
     skip_configure: bool = typer.Option(False),
+    resume_upload: bool = typer.Option(False),
 ):
     """
     Examples:
@@ -32,6 +33,8 @@ def run(
     python3 run.py --engines "qdrant-rps-m-*-ef-*" --datasets "dbpedia-openai-100K-1536-angular" # Qdrant RPS mode
 
     python3 run.py --engines "*-m-*-ef-*" --datasets "glove-*" # All engines and their configs for glove datasets
+
+    python3 run.py --engines "qdrant-m-16-ef-128" --datasets "deep-image-96-angular" --resume-upload # Continue an interrupted upload
     """
     all_engines = read_engine_configs()
     all_datasets = read_dataset_config()
@@ -68,6 +71,7 @@ def run(
                         skip_search,
                         skip_if_exists,
                         skip_configure,
+                        resume_upload,
                     )
                     try:
                         future.result(timeout=timeout)
@@ -0,0 +1,70 @@
+import json
+
+import numpy as np
+import pytest
+
+from dataset_reader.trace_reader import TraceReader
+from engine.base_client.schedule import iter_trace_offsets
+
+
+@pytest.fixture
+def jsonl_trace(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    lines = [
+        {"vector": [3.0, 4.0], "top": 5, "timestamp": 1712.0},
+        {
+            "vector": [0.0, 2.0],
+            "filter": {"and": [{"a": {"match": {"value": 1}}}]},
+            "expected_result": [7, 3],
+            "timestamp": 1712.5,
+        },
+        {"vector": [1.0, 0.0], "timestamp": 1714.0},
+    ]
+    path.write_text("\n".join(json.dumps(line) for line in lines) + "\n\n")
+    return path
+
+
+def test_jsonl_trace_keeps_the_inter_arrival_times(jsonl_trace):
+    queries = list(TraceReader(jsonl_trace).read_queries())
+
+    assert [query.top for query in queries] == [5, None, None]
+    assert queries[1].meta_conditions == {"and": [{"a": {"match": {"value": 1}}}]}
+    assert queries[1].expected_result == [7, 3]
+    offsets = iter_trace_offsets((query.timestamp for query in queries), speed=2.0)
+    assert list(offsets) == [0.0, 0.25, 1.0]
+
+
+def test_missing_timestamp_is_rejected_by_the_replay(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    path.write_text(
+        json.dumps({"vector": [1.0], "timestamp": 1.0})
+        + "\n"
+        + json.dumps({"vector": [1.0]})
+        + "\n"
+    )
+    queries = TraceReader(path).read_queries()
+
+    with pytest.raises(ValueError, match="timestamp"):
+        list(iter_trace_offsets(query.timestamp for query in queries))
+
+
+def test_npz_trace_is_normalized(tmp_path):
+    path = tmp_path / "trace.npz"
+    np.savez(
+        path,
+        vectors=np.array([[3.0, 4.0], [0.0, 2.0]]),
+        timestamps=np.array([10.0, 10.1]),
+        neighbours=np.array([[1, 2], [5, -1]]),
+        filters=np.array(["", json.dumps({"a": {"match": {"value": 1}}})]),
+    )
+    queries = list(TraceReader(path, normalize=True).read_queries())
+
+    assert queries[0].vector == pytest.approx([0.6, 0.8])
+    assert queries[1].vector == pytest.approx([0.0, 1.0])
+    assert [query.expected_result for query in queries] == [[1, 2], [5]]
+    assert [query.meta_conditions for query in queries] == [
+        None,
+        {"a": {"match": {"value": 1}}},
+    ]
+    offsets = list(iter_trace_offsets(query.timestamp for query in queries))
+    assert offsets == pytest.approx([0.0, 0.1])
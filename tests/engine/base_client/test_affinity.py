@@ -0,0 +1,27 @@
+import os
+
+import pytest
+
+from engine.base_client.affinity import plan_affinity
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "sched_setaffinity"), reason="requires sched_setaffinity"
+)
+
+
+def test_auto_layout_reserves_cores_for_the_parent():
+    parent, workers = plan_affinity({"cores": [0, 1, 2, 3], "reserve": 1}, 5)
+    assert parent == {0}
+    assert workers == [{1}, {2}, {3}, {1}, {2}]
+
+
+def test_explicit_layout_is_reused_round_robin():
+    parent, workers = plan_affinity({"parent": [0], "workers": [1, [2, 3]]}, 3)
+    assert parent == {0}
+    assert workers == [{1}, {2, 3}, {1}]
+
+
+def test_in_process_run_keeps_all_the_cores():
+    parent, workers = plan_affinity({"cores": [0, 1], "reserve": 1}, 0)
+    assert parent == {0, 1}
+    assert workers == []
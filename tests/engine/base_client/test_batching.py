@@ -0,0 +1,43 @@
+from dataset_reader.base_reader import Record
+from engine.base_client.batching import JSON_FLOAT_BYTES, AdaptiveBatcher
+
+
+def records(n: int, dim: int = 4):
+    return [
+        Record(id=i, vector=[0.0] * dim, sparse_vector=None, metadata=None)
+        for i in range(n)
+    ]
+
+
+def test_batches_follow_the_latency_band():
+    batcher = AdaptiveBatcher(10, latency=(0.1, 0.5), min_size=5, max_size=40)
+    batches = batcher.batches(records(200))
+
+    assert len(next(batches)) == 10
+    batcher.observe(0, 0.01)
+    assert len(next(batches)) == 20
+    batcher.observe(1, 0.01)
+    assert len(next(batches)) == 40
+    batcher.observe(2, 0.01)
+    # Capped by max_size
+    assert len(next(batches)) == 40
+    batcher.observe(3, 1.0)
+    assert len(next(batches)) == 20
+    batcher.observe(4, 0.3)
+    assert len(next(batches)) == 20
+
+    assert sum(batcher.sizes) + sum(len(batch) for batch in batches) == 200
+    assert batcher.stats()["initial_size"] == 10
+
+
+def test_batches_respect_the_byte_budget():
+    batcher = AdaptiveBatcher(
+        100, max_bytes=10 * 4 * JSON_FLOAT_BYTES, latency=(0.1, 0.5)
+    )
+    batches = list(batcher.batches(records(25)))
+
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    # A batch cut by the byte budget doesn't grow the size
+    batcher.observe(0, 0.01)
+    assert batcher.size == 100
+    assert batcher.stats()["byte_limited"] == 2
@@ -0,0 +1,26 @@
+import time
+
+import pytest
+
+from engine.base_client import breakdown
+
+
+def test_phases_start_at_the_previous_mark():
+    breakdown.start_marks()
+    start = time.perf_counter()
+    breakdown.mark(breakdown.RESPONSE_RECEIVED)
+    breakdown.mark(breakdown.DECODE_DONE)
+    end = time.perf_counter()
+
+    phases = breakdown.collect_phases(start, end)
+    # Without encode_done the encoding is counted as a part of the round-trip
+    assert list(phases) == ["network_time", "decode_time", "other_time"]
+    assert sum(phases.values()) == pytest.approx(end - start)
+
+
+def test_no_marks_outside_of_a_query():
+    breakdown.mark(breakdown.ENCODE_DONE)
+    assert breakdown.collect_phases(0.0, 1.0) is None
+
+    breakdown.start_marks()
+    assert breakdown.collect_phases(0.0, 1.0) is None
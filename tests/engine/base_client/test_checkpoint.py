@@ -0,0 +1,65 @@
+from dataset_reader.base_reader import Record
+from engine.base_client.checkpoint import UploadCheckpoint
+from engine.base_client.upload import BaseUploader
+from engine.base_client.utils import iter_batches
+
+
+def records(n: int):
+    return [
+        Record(id=i, vector=[0.0], sparse_vector=None, metadata=None) for i in range(n)
+    ]
+
+
+def test_resume_skips_the_contiguous_acknowledged_records(tmp_path):
+    checkpoint = UploadCheckpoint(tmp_path / "upload.json", save_interval=0.0)
+    batches = list(checkpoint.track(iter_batches(records(50), 10)))
+    assert len(batches) == 5
+
+    # Batch 1 is still in flight, so only batch 0 counts
+    for batch_id in (0, 2, 3):
+        checkpoint.ack(batch_id)
+    assert (checkpoint.last_id, checkpoint.records) == (9, 10)
+    checkpoint.ack(1)
+    assert (checkpoint.last_id, checkpoint.records) == (39, 40)
+
+    resumed = UploadCheckpoint(tmp_path / "upload.json")
+    assert resumed.load()
+    assert [record.id for record in resumed.skip(records(50))] == list(range(40, 50))
+
+
+def test_missing_checkpoint_is_not_loaded(tmp_path):
+    assert not UploadCheckpoint(tmp_path / "upload.json").load()
+
+
+class InsertOnlyUploader(BaseUploader):
+    upload_params = {"batch_size": 10}
+    operations = []
+
+    @classmethod
+    def init_client(cls, host, distance, connection_params, upload_params):
+        pass
+
+    @classmethod
+    def upload_batch(cls, batch):
+        cls.operations.append(("upload", [record.id for record in batch]))
+
+    @classmethod
+    def delete_batch(cls, ids):
+        cls.operations.append(("delete", ids))
+
+
+def test_resumed_upload_deletes_the_resent_records_first(tmp_path):
+    checkpoint = UploadCheckpoint(tmp_path / "upload.json", save_interval=0.0)
+    list(checkpoint.track(iter_batches(records(20), 10)))
+    # Batch 1 was committed, but the upload failed before it was acknowledged
+    checkpoint.ack(0)
+
+    resumed = UploadCheckpoint(tmp_path / "upload.json")
+    assert resumed.load()
+    uploader = InsertOnlyUploader("localhost", {}, InsertOnlyUploader.upload_params)
+    uploader.upload(None, records(30), resumed)
+
+    resent = [list(range(10, 20)), list(range(20, 30))]
+    assert InsertOnlyUploader.operations == [
+        (operation, ids) for ids in resent for operation in ("delete", "upload")
+    ]
@@ -0,0 +1,74 @@
+import pytest
+
+from dataset_reader.base_reader import Record
+from engine.base_client.churn import churn_search
+from engine.base_client.upload import BaseUploader
+
+CHURN = {"initial_deletes": 20, "cycles": 3, "reinserts": 10, "deletes": 15}
+
+
+def records(n: int = 100):
+    for i in range(n):
+        # Ids of a dataset are not required to be contiguous
+        yield Record(id=10 * i, vector=[0.0], sparse_vector=None, metadata=None)
+
+
+class InsertOnlyUploader(BaseUploader):
+    upload_params = {"batch_size": 8, "index_poll": {"confirmations": 1}}
+    collection = set()
+    failing_delete = None
+
+    @classmethod
+    def init_client(cls, host, distance, connection_params, upload_params):
+        pass
+
+    @classmethod
+    def upload_batch(cls, batch):
+        ids = {record.id for record in batch}
+        if not cls.collection.isdisjoint(ids):
+            raise ValueError(f"Duplicate ids: {cls.collection & ids}")
+        cls.collection |= ids
+
+    @classmethod
+    def delete_batch(cls, ids):
+        if cls.failing_delete in ids:
+            raise ConnectionError("delete timed out")
+        cls.collection -= set(ids)
+
+
+class FakeSearcher:
+    def __init__(self, search_params: dict):
+        self.search_params = search_params
+
+    def search_all(self, distance, queries):
+        return {"mean_precisions": 1.0, "mean_time": 0.001, "p99_time": 0.002}
+
+
+@pytest.fixture
+def uploader():
+    InsertOnlyUploader.collection = {record.id for record in records()}
+    InsertOnlyUploader.failing_delete = None
+    return InsertOnlyUploader("localhost", {}, InsertOnlyUploader.upload_params)
+
+
+def test_churn_uploads_the_deleted_records_back(uploader):
+    stats = churn_search(FakeSearcher({"churn": CHURN}), uploader, None, list, records)
+
+    assert [cycle["missing"] for cycle in stats["churn"]["cycles"]] == [20, 25, 30, 35]
+    assert InsertOnlyUploader.collection == {record.id for record in records()}
+
+
+def test_failed_delete_is_not_hidden_by_the_restore(uploader):
+    # Fails in a cycle, with other records of the cycle deleted already
+    InsertOnlyUploader.failing_delete = 10 * 42
+
+    with pytest.raises(ConnectionError):
+        churn_search(
+            FakeSearcher({"churn": {**CHURN, "cycles": 100, "seed": 1}}),
+            uploader,
+            None,
+            list,
+            records,
+        )
+    # The batch of the failed delete was not uploaded again as a duplicate
+    assert InsertOnlyUploader.collection == {record.id for record in records()}
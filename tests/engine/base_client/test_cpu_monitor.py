@@ -0,0 +1,26 @@
+import os
+import time
+
+import pytest
+
+from engine.base_client.cpu_monitor import CpuMonitor, read_process
+
+pytestmark = pytest.mark.skipif(
+    not os.path.exists("/proc/self/stat"), reason="requires /proc"
+)
+
+
+def test_busy_parent_is_reported_as_saturated():
+    monitor = CpuMonitor(os.getpid(), [])
+    monitor.start()
+    end = time.perf_counter() + 0.3
+    while time.perf_counter() < end:
+        pass
+    stats = monitor.stop()
+
+    assert stats["parent_cpu_utilisation"] > 0.5
+    assert stats["saturated"] == (len(stats["saturation_reasons"]) > 0)
+
+
+def test_gone_process_is_skipped():
+    assert read_process(2**22 + 1) is None
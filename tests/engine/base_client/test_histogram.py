@@ -0,0 +1,48 @@
+import random
+
+import numpy as np
+import pytest
+
+from engine.base_client.histogram import LatencyHistogram
+
+
+def test_percentiles_within_relative_error():
+    rng = random.Random(3)
+    values = [rng.lognormvariate(-5, 1) for _ in range(10_000)]
+    histogram = LatencyHistogram()
+    histogram.record_many(values)
+
+    for percentile in (50, 95, 99, 99.9):
+        expected = np.percentile(values, percentile, method="inverted_cdf")
+        assert histogram.value_at_percentile(percentile) == pytest.approx(
+            expected, rel=2e-3
+        )
+    assert histogram.mean == pytest.approx(np.mean(values))
+    assert histogram.max == max(values)
+
+
+def test_merge_equals_single_histogram():
+    values = [i / 1000 for i in range(1, 1001)]
+    single, left, right = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    single.record_many(values)
+    left.record_many(values[::2])
+    right.record_many(values[1::2])
+
+    merged = left.merge(right)
+    assert merged.counts == single.counts
+    assert merged.stats() == pytest.approx(single.stats())
+
+    with pytest.raises(ValueError):
+        merged.merge(LatencyHistogram(significant_figures=2))
+
+
+def test_encode_roundtrip():
+    histogram = LatencyHistogram()
+    histogram.record_many([0.001, 0.002, 0.002, 1.5])
+    decoded = LatencyHistogram.decode(histogram.encode())
+    assert decoded.counts == histogram.counts
+    assert decoded.stats() == histogram.stats()
+
+
+def test_empty_stats():
+    assert set(LatencyHistogram().stats().values()) == {None}
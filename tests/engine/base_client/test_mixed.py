@@ -0,0 +1,109 @@
+import json
+import time
+
+import pytest
+
+from dataset_reader.base_reader import Record
+from engine.base_client.mixed import BackgroundWriter, mixed_search
+from engine.base_client.upload import BaseUploader
+
+
+def records(n: int):
+    return [
+        Record(id=i, vector=[0.0], sparse_vector=None, metadata=None) for i in range(n)
+    ]
+
+
+class InsertOnlyUploader(BaseUploader):
+    """
+    Logs the operations to the file of the "log" upload param, the workers
+    append to it from their own processes
+    """
+
+    @classmethod
+    def get_mp_start_method(cls):
+        return "fork"
+
+    @classmethod
+    def init_client(cls, host, distance, connection_params, upload_params):
+        cls.upload_params = upload_params
+
+    @classmethod
+    def _log(cls, operation: str, ids):
+        with open(cls.upload_params["log"], "a") as log:
+            log.write(json.dumps([operation, list(ids)]) + "\n")
+
+    @classmethod
+    def upload_batch(cls, batch):
+        cls._log("upload", [record.id for record in batch])
+
+    @classmethod
+    def delete_batch(cls, ids):
+        cls._log("delete", ids)
+
+
+class UpsertingUploader(InsertOnlyUploader):
+    upserts = True
+
+
+class FakeSearcher:
+    def __init__(self, search_params: dict):
+        self.search_params = search_params
+
+    def search_all(self, distance, queries):
+        time.sleep(0.5)
+        return {"rps": 100.0}
+
+
+def read_log(path):
+    with open(path) as log:
+        return [json.loads(line) for line in log]
+
+
+def test_writer_never_inserts_an_existing_id(tmp_path):
+    log = tmp_path / "log.jsonl"
+    uploader = InsertOnlyUploader("localhost", {}, {"log": str(log)})
+    writer = BackgroundWriter(
+        uploader, None, lambda: records(100), write_rps=1000, parallel=2, batch_size=10
+    )
+    writer.start()
+    time.sleep(0.3)
+    stats = writer.stop()
+
+    collection = {record.id for record in records(100)}
+    for operation, ids in read_log(log):
+        if operation == "delete":
+            collection -= set(ids)
+        else:
+            assert collection.isdisjoint(ids)
+            collection |= set(ids)
+    assert stats["batches"] > 0
+    assert stats["records"] == stats["deleted_records"] == 10 * stats["batches"]
+
+
+def test_mixed_search_reports_the_writes(tmp_path):
+    log = tmp_path / "log.jsonl"
+    uploader = UpsertingUploader("localhost", {}, {"log": str(log)})
+    searcher = FakeSearcher(
+        {
+            "rps": 100,
+            "mixed": {"read_write_ratio": 0.1, "batch_size": 10, "delete_ratio": 0.5},
+        }
+    )
+    stats = mixed_search(searcher, uploader, None, lambda: [], lambda: records(100))
+
+    writes = stats["writes"]
+    assert stats["rps"] == 100.0
+    assert writes["target_write_rps"] == 1000
+    assert writes["records"] == 10 * writes["batches"] > 0
+    # Every other batch is deleted, the other ones upserted
+    assert writes["deleted_records"] == 10 * (writes["batches"] // 2)
+    assert writes["read_write_ratio"] == pytest.approx(100.0 / writes["write_rps"])
+    deletes = [ids for operation, ids in read_log(log) if operation == "delete"]
+    assert len(deletes) == writes["batches"] // 2
+
+
+def test_mixed_search_needs_a_write_rate():
+    searcher = FakeSearcher({"mixed": {"read_write_ratio": 10}})
+    with pytest.raises(ValueError, match="requires the search rps"):
+        mixed_search(searcher, UpsertingUploader("localhost", {}, {}), None, list, list)
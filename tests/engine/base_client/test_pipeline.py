@@ -0,0 +1,77 @@
+from multiprocessing import get_context
+
+import pytest
+
+from dataset_reader.base_reader import Record
+from engine.base_client.pipeline import UploadPipeline
+from engine.base_client.upload import BaseUploader
+from engine.base_client.utils import BatchUploadError, iter_batches
+
+FAILING_ID = 42
+
+
+def records(n: int):
+    return [
+        Record(id=i, vector=[float(i)], sparse_vector=None, metadata=None)
+        for i in range(n)
+    ]
+
+
+class FakeUploader(BaseUploader):
+    @classmethod
+    def init_client(cls, host, distance, connection_params, upload_params):
+        pass
+
+    @classmethod
+    def encode_batch(cls, batch):
+        return [record.id for record in batch]
+
+    @classmethod
+    def upload_encoded(cls, payload):
+        if FAILING_ID in payload:
+            raise RuntimeError("engine rejected the batch")
+
+
+class FailingEncodeUploader(FakeUploader):
+    @classmethod
+    def encode_batch(cls, batch):
+        raise ValueError("can't encode")
+
+
+def run(uploader_class, batches, observe=None):
+    return UploadPipeline(
+        get_context("fork"), uploader_class, (None, None, {}, {}), workers=2
+    ).run(batches, observe)
+
+
+def test_pipeline_uploads_every_record():
+    observed = []
+    results, stats = run(
+        FakeUploader,
+        iter_batches(records(40), 8),
+        lambda batch_id, latency: observed.append(batch_id),
+    )
+
+    assert stats["records"] == 40
+    assert sorted(batch_id for _, _, batch_id in results) == list(range(5))
+    assert sorted(observed) == list(range(5))
+    assert set(stats["stages"]) == {"read", "encode", "send"}
+
+
+def test_pipeline_propagates_a_send_error():
+    with pytest.raises(BatchUploadError, match="ids 40..47"):
+        run(FakeUploader, iter_batches(records(100), 8))
+
+
+def test_pipeline_propagates_an_encode_error():
+    with pytest.raises(BatchUploadError, match="Encoding of batch 0"):
+        run(FailingEncodeUploader, iter_batches(records(8), 8))
+
+
+def test_pipeline_propagates_a_reader_error():
+    def batches():
+        yield records(8)
+        raise OSError("dataset file is truncated")
+
+    with pytest.raises(OSError, match="truncated"):
+        run(FakeUploader, batches())
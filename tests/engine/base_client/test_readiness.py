@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from engine.base_client.readiness import (
+    IndexNotReadyError,
+    IndexStatus,
+    ReadinessPoller,
+)
+
+
+def test_poll_records_the_progress_until_confirmed_ready():
+    statuses = iter(
+        [
+            IndexStatus(False, indexed=0, total=100),
+            IndexStatus(False, indexed=0, total=100),
+            IndexStatus(False, indexed=60, total=100),
+            IndexStatus(True, indexed=100, total=100),
+            IndexStatus(False, indexed=100, total=120),
+            IndexStatus(True, indexed=120, total=120),
+            IndexStatus(True, indexed=120, total=120),
+        ]
+    )
+    poller = ReadinessPoller(
+        initial_interval=0.0,
+        max_interval=0.0,
+        confirmations=2,
+        confirmation_interval=0.0,
+    )
+
+    stats = poller.poll(lambda: next(statuses))
+
+    assert stats["polls"] == 7
+    # Unchanged progress is recorded once
+    assert [(entry["indexed"], entry["total"]) for entry in stats["progress"]] == [
+        (0, 100),
+        (60, 100),
+        (100, 100),
+        (100, 120),
+        (120, 120),
+    ]
+    assert 0.0 <= stats["time_to_ready"]
+    assert 0.0 <= stats["confirmation_time"]
+
+
+def test_poll_gives_up_with_the_last_status():
+    poller = ReadinessPoller(initial_interval=0.0, max_interval=0.0, timeout=0.05)
+
+    with pytest.raises(IndexNotReadyError) as error:
+        poller.poll(lambda: IndexStatus(False, indexed=10, total=100))
+    assert error.value.status == IndexStatus(False, indexed=10, total=100)
+
+
+def test_poll_takes_the_completion_time_of_the_status():
+    start = time.perf_counter()
+    statuses = iter([IndexStatus(False), IndexStatus(True, completed_at=start)])
+    poller = ReadinessPoller(initial_interval=0.2, confirmations=1)
+
+    stats = poller.poll(lambda: next(statuses))
+
+    # The completion was noticed one interval later, which is not indexing
+    assert stats["time_to_ready"] < 0.1
+    assert stats["confirmation_time"] >= 0.2
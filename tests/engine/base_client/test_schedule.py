@@ -0,0 +1,63 @@
+import itertools
+
+import pytest
+
+from engine.base_client.schedule import (
+    InFlightLimiter,
+    iter_arrivals,
+    iter_passes,
+    iter_trace_offsets,
+    iter_until,
+)
+
+
+def test_fixed_arrivals_are_evenly_spaced():
+    offsets = list(itertools.islice(iter_arrivals(4, "fixed"), 5))
+    assert offsets == [0.0, 0.25, 0.5, 0.75, 1.0]
+
+
+def test_poisson_arrivals_keep_the_mean_rate():
+    offsets = list(itertools.islice(iter_arrivals(100, "poisson", seed=1), 10_001))
+    assert offsets == sorted(offsets)
+    assert offsets[-1] == pytest.approx(100, rel=0.05)
+
+
+def test_unknown_arrival_is_rejected():
+    with pytest.raises(ValueError):
+        next(iter_arrivals(10, "bursty"))
+
+
+def test_shuffled_passes_cover_every_item_once():
+    items = list(range(10))
+    passes = list(itertools.islice(iter_passes(items, shuffle=True, seed=7), 30))
+    for i in range(3):
+        assert sorted(passes[i * 10 : (i + 1) * 10]) == items
+    assert passes[:10] != passes[10:20]
+
+
+def test_passes_of_empty_set_end_immediately():
+    assert list(iter_passes([])) == []
+
+
+def test_iter_until_stops_endless_stream():
+    assert list(iter_until(itertools.count(), 0.0)) == []
+
+
+def test_trace_offsets_keep_inter_arrival_times():
+    offsets = list(iter_trace_offsets([100.0, 100.5, 100.5, 103.0], speed=2.0))
+    assert offsets == [0.0, 0.25, 0.25, 1.5]
+
+    with pytest.raises(ValueError):
+        list(iter_trace_offsets([100.0, None]))
+
+
+def test_in_flight_limiter_stops_feeding_once_results_are_abandoned():
+    limiter = InFlightLimiter(2)
+    fed = limiter.feed(iter(range(10)))
+    assert [next(fed), next(fed)] == [0, 1]
+
+    results = limiter.results(iter([0]))
+    assert next(results) == 0
+    results.close()
+    # The slot of the abandoned results is released, but nothing is fed anymore
+    assert list(fed) == []
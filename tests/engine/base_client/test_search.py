@@ -0,0 +1,19 @@
+from engine.base_client.search import BaseSearcher
+
+
+class FakeSearcher(BaseSearcher):
+    @classmethod
+    def init_client(cls, host, distance, connection_params, search_params):
+        pass
+
+    @classmethod
+    def search_one(cls, query, top):
+        return []
+
+
+def test_duration_run_of_an_empty_query_set_reports_empty_stats():
+    stats = FakeSearcher("localhost", {}, {"duration": 0.1}).search_all("cosine", [])
+
+    assert stats["query_passes"] is None
+    assert stats["p99_time"] is None
+    assert stats["mean_precisions"] is None
@@ -0,0 +1,98 @@
+import os
+
+import pytest
+
+from dataset_reader.base_reader import Query
+from engine.base_client.search import BaseSearcher
+from engine.base_client.shared_queries import SharedQueries
+
+
+@pytest.fixture
+def queries():
+    return [
+        Query(
+            vector=[0.5, 1.0, -2.0],
+            sparse_vector=None,
+            meta_conditions=None,
+            expected_result=[3, 1, 2],
+        ),
+        Query(
+            vector=[0.0, 0.25, 4.0],
+            sparse_vector=None,
+            meta_conditions={"and": [{"a": {"match": {"value": 1}}}]},
+            expected_result=[7],
+        ),
+    ]
+
+
+def test_attached_queries_match_original(queries):
+    shared = SharedQueries.create(queries)
+    try:
+        attached = SharedQueries.attach(shared.descriptor())
+        assert len(attached) == 2
+        assert attached[0] == queries[0]
+        assert attached[1] == queries[1]
+        attached.close()
+    finally:
+        shared.close()
+        shared.unlink()
+
+
+def test_missing_ground_truth_stays_none():
+    shared = SharedQueries.create(
+        [
+            Query(
+                vector=[1.0, 2.0],
+                sparse_vector=None,
+                meta_conditions=None,
+                expected_result=None,
+            )
+        ]
+    )
+    try:
+        assert shared[0].expected_result is None
+        assert shared[0].meta_conditions is None
+    finally:
+        shared.close()
+        shared.unlink()
+
+
+def test_sparse_queries_are_rejected():
+    with pytest.raises(ValueError):
+        SharedQueries.create(
+            [
+                Query(
+                    vector=None,
+                    sparse_vector=object(),
+                    meta_conditions=None,
+                    expected_result=None,
+                )
+            ]
+        )
+
+
+class FailingSearcher(BaseSearcher):
+    @classmethod
+    def get_mp_start_method(cls):
+        return "fork"
+
+    @classmethod
+    def init_client(cls, host, distance, connection_params, search_params):
+        pass
+
+    @classmethod
+    def search_one(cls, query, top):
+        raise RuntimeError("engine is down")
+
+
+def test_failed_search_releases_the_shared_memory(queries):
+    def segments():
+        return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")}
+
+    before = segments()
+    searcher = FailingSearcher("localhost", {}, {"parallel": 2, "shared_queries": True})
+    # A single query, so no other worker is writing a result when the pool
+    # gets terminated
+    with pytest.raises(RuntimeError):
+        searcher.search_all("cosine", queries[:1])
+    assert segments() == before
@@ -0,0 +1,29 @@
+from engine.base_client.search import BaseSearcher
+from engine.base_client.sweep import CURVE_FIELDS, sweep_search
+
+
+class FakeSearcher(BaseSearcher):
+    def search_all(self, distance, queries):
+        if self.search_params["parallel"] > 2:
+            # Every query timed out, no stats
+            return {field: None for field in CURVE_FIELDS}
+        return {
+            "rps": 100.0 * self.search_params["parallel"],
+            "mean_time": 0.01,
+            "p95_time": 0.02,
+            "p99_time": 0.03,
+            "max_time": 0.04,
+            "mean_precisions": 0.9,
+        }
+
+
+def test_step_without_completed_queries_fails_the_target():
+    searcher = FakeSearcher(
+        "localhost", {}, {"sweep": {"parallel": [1, 2, 4, 8], "p99_sla": 0.05}}
+    )
+
+    stats, params, summary = sweep_search(searcher, "cosine", list)
+
+    assert params["parallel"] == 2
+    assert summary["knee_rps"] == 200.0
+    assert [point["passed"] for point in summary["curve"]] == [True, True, False]
@@ -0,0 +1,39 @@
+import pytest
+
+from engine.base_client.timeseries import TimeSeries
+
+
+def test_requests_are_grouped_by_window():
+    series = TimeSeries(window=1.0, start=100.0)
+    series.record(100.2, 0.01)
+    series.record(100.9, 0.03)
+    series.record(102.5, 0.02)
+
+    windows = series.to_list(end=102.75)
+    assert [window["time"] for window in windows] == [0.0, 1.0, 2.0]
+    assert [window["count"] for window in windows] == [2, 0, 1]
+    assert windows[0]["max_time"] == pytest.approx(0.03)
+    # A stall shows up as an empty window
+    assert windows[1]["rps"] == 0.0
+    assert windows[1]["p99_time"] is None
+    # The last window is only partially covered by the run
+    assert windows[2]["rps"] == pytest.approx(1 / 0.75)
+
+
+def test_window_must_be_positive():
+    with pytest.raises(ValueError):
+        TimeSeries(window=0)
+
+
+def test_precision_is_averaged_per_window():
+    series = TimeSeries(window=1.0, start=0.0)
+    series.record(0.5, 0.01, precision=1.0)
+    series.record(0.6, 0.01, precision=0.5)
+    series.record(2.5, 0.01, precision=0.9)
+
+    windows = series.to_list(end=2.75)
+    assert [window["mean_precision"] for window in windows] == [0.75, None, 0.9]
+    # Series without precisions, e.g. uploads, don't have the key at all
+    uploads = TimeSeries(window=1.0, start=0.0)
+    uploads.record(0.5, 0.01)
+    assert "mean_precision" not in uploads.to_list()[0]
@@ -0,0 +1,21 @@
+from engine.base_client.readiness import ReadinessPoller
+from engine.base_client.upload import BaseUploader
+
+
+def test_wait_index_ready_needs_a_confirmed_streak():
+    observations = iter([True, False, True, True, False])
+
+    class Uploader(BaseUploader):
+        @classmethod
+        def index_ready(cls) -> bool:
+            return next(observations)
+
+    poller = ReadinessPoller(
+        initial_interval=0.0,
+        max_interval=0.0,
+        confirmations=2,
+        confirmation_interval=0.0,
+    )
+    assert Uploader.wait_index_ready(poller) >= 0.0
+    # The single ready observation before the not-ready one was discarded
+    assert next(observations) is False
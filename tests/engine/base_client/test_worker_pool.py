@@ -0,0 +1,64 @@
+import os
+import time
+from multiprocessing import get_context
+
+import pytest
+
+from engine.base_client.worker_pool import WorkerPool, WorkerPoolCache
+
+
+def _noop():
+    pass
+
+
+def _fail_once(marker: str):
+    # Only the first worker to create the marker fails
+    try:
+        os.close(os.open(marker, os.O_CREAT | os.O_EXCL))
+    except FileExistsError:
+        return
+    raise RuntimeError("broadcast failed")
+
+
+def test_failed_broadcast_releases_the_workers_and_is_not_reused(tmp_path):
+    def create_pool():
+        return WorkerPool(
+            get_context("fork"), processes=2, initializer=_noop, initargs=()
+        )
+
+    with WorkerPoolCache() as cache:
+        pool, _ = cache.get("key", create_pool)
+        pool.wait_ready()
+
+        start = time.perf_counter()
+        with pytest.raises(RuntimeError):
+            pool.broadcast(_fail_once, str(tmp_path / "marker"))
+        # The worker which succeeded didn't wait for the barrier timeout
+        assert time.perf_counter() - start < 10
+        assert pool.broken
+
+        replacement, created = cache.get("key", create_pool)
+        assert created
+        assert replacement is not pool
+        replacement.wait_ready()
+        assert replacement.broadcast(os.getpid) != pool.pids
+
+
+def test_cache_keeps_only_the_pool_of_the_last_key():
+    def create_pool():
+        return WorkerPool(
+            get_context("fork"), processes=1, initializer=_noop, initargs=()
+        )
+
+    with WorkerPoolCache() as cache:
+        first, _ = cache.get(1, create_pool)
+        first.wait_ready()
+        assert cache.get(1, create_pool) == (first, False)
+
+        second, created = cache.get(2, create_pool)
+        second.wait_ready()
+        assert created
+        # The first pool was terminated, not left idle
+        with pytest.raises(ValueError):
+            first.pool.apply(os.getpid)
+        assert cache.get(1, create_pool)[1]